@@ -0,0 +1,70 @@
+import argparse
+import os
+import tempfile
+
+from components.validate_archive import find_file_pairs, validate_archive
+from benchmarks.synthetic import make_requirements, make_parameters, write_requirements, write_parameters
+
+
+def make_archive(archive_dir: str,
+                 release_count: int,
+                 versions: int,
+                 pair_count: int) -> None:
+  """
+  Writes release_count releases, each with one requirements file shared by
+  versions parameters snapshots.
+  """
+  for rel_idx in range(release_count):
+    rel_dir = os.path.join(archive_dir, f"release{rel_idx}")
+    os.makedirs(rel_dir)
+    write_requirements(os.path.join(rel_dir, 'requirements.json'),
+                       make_requirements(pair_count, seed=rel_idx))
+    for ver_idx in range(versions):
+      ver_dir = os.path.join(rel_dir, f"v{ver_idx}")
+      os.makedirs(ver_dir)
+      write_parameters(os.path.join(ver_dir, 'parameters.json'),
+                       make_parameters(pair_count, pair_count, seed=ver_idx))
+
+
+def run(release_count: int,
+        versions: int,
+        pair_count: int,
+        worker_counts: list[int]):
+  with tempfile.TemporaryDirectory() as work_dir:
+    archive_dir = os.path.join(work_dir, 'archive')
+    make_archive(archive_dir, release_count, versions, pair_count)
+    file_pairs = find_file_pairs(archive_dir)
+    print(f"{len(file_pairs)} file pairs of {pair_count} parameters, "
+          f"{release_count} requirements files, {os.cpu_count()} core(s)")
+
+    base_time = None
+    for worker_count in worker_counts:
+      report = validate_archive(file_pairs,
+                                os.path.join(work_dir, 'results.json'),
+                                worker_count)
+      base_time = base_time or report['seconds']
+      print(f"  {report['workers']:3d} worker(s) {report['seconds']:8.2f} s  "
+            f"{report['totals']['pairs'] / report['seconds']:12.0f} pairs/s  "
+            f"{base_time / report['seconds']:5.2f}x")
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(prog='Archive validation benchmark')
+  parser.add_argument('--releases',
+                      type=int,
+                      default=4)
+  parser.add_argument('--versions',
+                      type=int,
+                      default=25)
+  parser.add_argument('--pairs',
+                      type=int,
+                      default=2000)
+  parser.add_argument('--workers',
+                      type=int,
+                      nargs='*',
+                      default=sorted(set([1, 2, 4, os.cpu_count() or 1])))
+  args = parser.parse_args()
+  run(args.releases,
+      args.versions,
+      args.pairs,
+      args.workers)
@@ -0,0 +1,104 @@
+import argparse
+import random
+
+from time import perf_counter
+
+from benchmarks.synthetic import make_param_reqs
+from components.batch_validation import BatchValidator
+from components.validate_requirements import get_bounds, get_failing_params, parse_bnd_str, parse_param_str, Parameter
+
+
+def clear_parse_caches():
+  get_bounds.cache_clear()
+  parse_param_str.cache_clear()
+  parse_bnd_str.cache_clear()
+
+
+def time_call(func, repeat: int) -> float:
+  """
+  Returns the best time of repeat calls, each starting from empty parse
+  caches so both paths parse every distinct string.
+  """
+  best = None
+  for _ in range(repeat):
+    clear_parse_caches()
+    start = perf_counter()
+    func()
+    elapsed = perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+
+  return best
+
+
+def scalar_fix(param_reqs):
+  new_vals = []
+  for param_obj, req_obj in param_reqs:
+    param = Parameter(param_obj['value'])
+    new_vals.append(get_bounds(req_obj['bounds']).get_nearest_passing_value(param.value))
+  return new_vals
+
+
+def repeat_values(param_reqs: list[tuple[dict[str, object], dict[str, object]]],
+                  distinct: float,
+                  seed: int = 0) -> list[tuple[dict[str, object], dict[str, object]]]:
+  """
+  Returns as many pairs as param_reqs whose values and bounds are drawn from
+  only a distinct fraction of them, as in models where many parameters share
+  a value and many requirements share bounds.
+  """
+  rnd = random.Random(seed)
+  pool = param_reqs[:max(1, int(len(param_reqs) * distinct))]
+  return [(dict(param_obj, value=rnd.choice(pool)[0]['value']),
+           dict(req_obj, bounds=rnd.choice(pool)[1]['bounds']))
+          for param_obj, req_obj in param_reqs]
+
+
+def run(pair_count: int,
+        repeat: int,
+        distinct: float):
+  param_reqs = make_param_reqs(pair_count)
+  if distinct < 1:
+    param_reqs = repeat_values(param_reqs,
+                               distinct)
+
+  scalar_fail = get_failing_params(param_reqs, batch=False)
+  batch_fail = get_failing_params(param_reqs, batch=True)
+  assert scalar_fail == batch_fail, 'Batch and scalar failing sets differ'
+  assert scalar_fix(param_reqs) == BatchValidator(param_reqs).get_nearest_passing_values().tolist(), \
+    'Batch and scalar corrections differ'
+
+  validator = BatchValidator(param_reqs)
+  results = {
+    'batch build': time_call(lambda: BatchValidator(param_reqs), repeat),
+    'batch eval': time_call(lambda: (validator.is_satisfied(), validator.get_nearest_passing_values()), repeat),
+    'scalar check': time_call(lambda: get_failing_params(param_reqs, batch=False), repeat),
+    'batch check': time_call(lambda: get_failing_params(param_reqs, batch=True), repeat),
+    'scalar fix': time_call(lambda: scalar_fix(param_reqs), repeat),
+    'batch fix': time_call(lambda: BatchValidator(param_reqs).get_nearest_passing_values(), repeat),
+  }
+
+  print(f"{pair_count} pairs ({distinct:.0%} distinct values), {len(scalar_fail)} failing, best of {repeat}")
+  for name, elapsed in results.items():
+    print(f"  {name:<14}{elapsed * 1000:10.2f} ms")
+  print(f"  check speedup {results['scalar check'] / results['batch check']:.1f}x, "
+        f"fix speedup {results['scalar fix'] / results['batch fix']:.1f}x")
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(prog='Batch validation benchmark')
+  parser.add_argument('--pairs',
+                      type=int,
+                      nargs='*',
+                      default=[100000])
+  parser.add_argument('--repeat',
+                      type=int,
+                      default=5)
+  parser.add_argument('--distinct',
+                      type=float,
+                      default=1.0,
+                      help='Fraction of pairs with their own value and bounds strings')
+  args = parser.parse_args()
+  for pair_count in args.pairs:
+    run(pair_count,
+        args.repeat,
+        args.distinct)
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+
+from time import perf_counter
+
+from components.validate_requirements import load_requirements, load_parameters
+
+
+LOADERS = {'requirements': load_requirements,
+           'parameters': load_parameters}
+
+
+def write_requirements(req_file: str,
+                       size_mb: float,
+                       seed: int = 0) -> int:
+  """
+  Writes a synthetic Cameo requirements export of about size_mb megabytes.
+  Besides qualified_name and bounds, every requirement carries the kind of
+  descriptive fields a real export has, which validation never reads.
+  """
+  rnd = random.Random(seed)
+  target_size = size_mb * 1e6
+  req_count = 0
+  with open(req_file, 'w', encoding='Windows-1252') as fout:
+    fout.write('[')
+    while fout.tell() < target_size:
+      lo = round(rnd.uniform(0, 100), 2)
+      req_obj = {'id': f"_{rnd.getrandbits(64):016x}",
+                 'qualified_name': f"System::Subsystem{req_count % 50}::Req{req_count}::Param{req_count}",
+                 'bounds': f"[{lo};{round(lo + rnd.uniform(0, 100), 2)}]",
+                 'text': 'The parameter shall remain within the specified bounds. ' * 8,
+                 'owner': f"System::Subsystem{req_count % 50}",
+                 'stereotypes': ['requirement', 'performanceRequirement'],
+                 'trace': [f"_{rnd.getrandbits(64):016x}" for _ in range(4)]}
+      fout.write((',' if req_count > 0 else '') + json.dumps(req_obj))
+      req_count += 1
+    fout.write(']')
+
+  return req_count
+
+
+def write_parameters(param_file: str,
+                     size_mb: float,
+                     part_size: int = 100,
+                     seed: int = 0) -> int:
+  """
+  Writes a synthetic CAD parameters export of about size_mb megabytes,
+  grouped into parts of part_size parameters (one part holding every
+  parameter if part_size is None) with extra per-part and per-parameter
+  fields. Parts are written one parameter at a time, so a single-part
+  export is not built in memory.
+  """
+  rnd = random.Random(seed)
+  target_size = size_mb * 1e6
+  param_count = 0
+  with open(param_file, 'w') as fout:
+    fout.write('[')
+    while fout.tell() < target_size:
+      part_idx = param_count // part_size if part_size else 0
+      part_obj = {'part': f"Part{part_idx}",
+                  'path': f"/Product/Assembly/Part{part_idx}",
+                  'properties': {f"prop{prop_idx}": 'x' * 20 for prop_idx in range(20)}}
+      fout.write((',' if param_count > 0 else '') + json.dumps(part_obj)[:-1] + ', "parameters": [')
+      part_start = param_count
+      while fout.tell() < target_size and (part_size is None or param_count - part_start < part_size):
+        param = {'name': f"Part{part_idx}\\Param{param_count}",
+                 'value': f"{round(rnd.uniform(-50, 250), 2)}mm",
+                 'units': 'mm',
+                 'type': 'Length',
+                 'comment': 'Driven by the design table. ' * 4,
+                 'access': 'ReadWrite'}
+        fout.write((',' if param_count > part_start else '') + json.dumps(param))
+        param_count += 1
+      fout.write(']}')
+    fout.write(']')
+
+  return param_count
+
+
+def measure(kind: str,
+            file_name: str,
+            streaming: bool) -> dict[str, float]:
+  """
+  Loads one file and reports the parse time and the process's peak RSS.
+  Run in a fresh process so each loader's peak is measured on its own.
+  """
+  base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  encoding = 'Windows-1252' if kind == 'requirements' else 'utf-8'
+  start = perf_counter()
+  with open(file_name, 'r', encoding=encoding) as fin:
+    objs = LOADERS[kind](fin, streaming)
+  elapsed = perf_counter() - start
+  peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return {'seconds': elapsed,
+          'peak_rss_mb': peak_rss / 1024,
+          'added_rss_mb': (peak_rss - base_rss) / 1024,
+          'count': len(objs)}
+
+
+def run(size_mb: float,
+        work_dir: str):
+  files = [('requirements', os.path.join(work_dir, 'requirements.json')),
+           ('parameters', os.path.join(work_dir, 'parameters.json')),
+           ('parameters', os.path.join(work_dir, 'parameters_single_part.json'))]
+  print(f"Writing {size_mb:.0f} MB synthetic exports to {work_dir} ...")
+  write_requirements(files[0][1], size_mb)
+  write_parameters(files[1][1], size_mb)
+  write_parameters(files[2][1], size_mb, part_size=None)
+
+  for kind, file_name in files:
+    print(f"{os.path.basename(file_name)} ({os.path.getsize(file_name) / 1e6:.0f} MB)")
+    for streaming in [False, True]:
+      child = subprocess.run([sys.executable, '-m', 'benchmarks.bench_json_parsing',
+                              '--measure', kind, file_name] + (['--streaming'] if streaming else []),
+                             capture_output=True,
+                             text=True,
+                             check=True)
+      result = json.loads(child.stdout)
+      mode = 'streamed' if streaming else 'json.load'
+      print(f"  {mode:<10}{result['seconds']:8.2f} s, peak RSS {result['peak_rss_mb']:8.1f} MB "
+            f"(+{result['added_rss_mb']:.1f} MB for {result['count']} entries)")
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(prog='JSON parsing benchmark')
+  parser.add_argument('--mb',
+                      type=float,
+                      default=200,
+                      help='Approximate size of each synthetic file')
+  parser.add_argument('--dir',
+                      help='Directory for the synthetic files (default: a temporary directory)')
+  parser.add_argument('--measure',
+                      nargs=2,
+                      metavar=('KIND', 'FILE'),
+                      help=argparse.SUPPRESS)
+  parser.add_argument('--streaming',
+                      action='store_true',
+                      help=argparse.SUPPRESS)
+  args = parser.parse_args()
+
+  if args.measure:
+    print(json.dumps(measure(args.measure[0],
+                             args.measure[1],
+                             args.streaming)))
+  elif args.dir:
+    run(args.mb, args.dir)
+  else:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      run(args.mb, tmp_dir)
@@ -0,0 +1,152 @@
+import argparse
+import threading
+
+from datetime import datetime, timezone
+from time import monotonic, sleep
+from types import SimpleNamespace
+
+from shared.constants import WATCH_MIN_INTERVAL, WATCH_MAX_INTERVAL, WATCH_SETTLE_TIME
+from shared.revision_watcher import RevisionWatcher
+
+
+class FakeRegistry():
+  """
+  In-memory stand-in for the registry: each model has one file whose
+  revisions are added by add_revision. get_model and get_file are counted
+  separately since get_model also returns artifact and job lists.
+  """
+
+  def __init__(self,
+               mod_ids: list[str]):
+    self.lock = threading.Lock()
+    self.get_model_calls = 0
+    self.get_file_calls = 0
+    self.files = {}
+    for mod_id in mod_ids:
+      self.files[mod_id] = SimpleNamespace(id=f"file-{mod_id}",
+                                           revisions=[])
+      self.add_revision(mod_id)
+
+  def add_revision(self,
+                   mod_id: str) -> None:
+    with self.lock:
+      revs = self.files[mod_id].revisions
+      revs.append(SimpleNamespace(id=f"{mod_id}-rev{len(revs)}",
+                                  created=datetime.now(timezone.utc),
+                                  display_name=mod_id))
+
+  def get_model(self,
+                mod_id: str):
+    with self.lock:
+      self.get_model_calls += 1
+      mod_file = self.files[mod_id]
+      return SimpleNamespace(file=SimpleNamespace(id=mod_file.id,
+                                                  revisions=list(mod_file.revisions)))
+
+  def get_file(self,
+               file_id: str):
+    with self.lock:
+      self.get_file_calls += 1
+      for mod_file in self.files.values():
+        if mod_file.id == file_id:
+          return SimpleNamespace(id=file_id,
+                                 revisions=list(mod_file.revisions))
+
+
+def run_schedule(registry: FakeRegistry,
+                 schedule: list[tuple[float, str]]) -> None:
+  start = monotonic()
+  for at_time, mod_id in schedule:
+    sleep(max(at_time - (monotonic() - start), 0.0))
+    registry.add_revision(mod_id)
+
+
+def fixed_poll(registry: FakeRegistry,
+               mod_ids: list[str],
+               interval: float,
+               duration: float) -> dict[str, object]:
+  """
+  The old behaviour: get_model on every model at a fixed interval, one
+  wake-up per detected change.
+  """
+  rev_counts = {mod_id: len(registry.get_model(mod_id).file.revisions) for mod_id in mod_ids}
+  wakeups = 0
+  detect_delays = []
+  start = monotonic()
+  while monotonic() - start < duration:
+    sleep(interval)
+    for mod_id in mod_ids:
+      revs = registry.get_model(mod_id).file.revisions
+      if len(revs) != rev_counts[mod_id]:
+        now = datetime.now(timezone.utc)
+        detect_delays += [(now - rev.created).total_seconds() for rev in revs[rev_counts[mod_id]:]]
+        rev_counts[mod_id] = len(revs)
+        wakeups += 1
+
+  return {'wakeups': wakeups,
+          'mean_detect_s': sum(detect_delays) / len(detect_delays) if detect_delays else None}
+
+
+def watch(registry: FakeRegistry,
+          mod_ids: list[str],
+          scale: float,
+          duration: float) -> dict[str, object]:
+  watcher = RevisionWatcher(registry,
+                            min_interval=WATCH_MIN_INTERVAL * scale,
+                            max_interval=WATCH_MAX_INTERVAL * scale,
+                            settle_time=WATCH_SETTLE_TIME * scale,
+                            show_status=False)
+  watcher.watch(mod_ids)
+  start = monotonic()
+  while monotonic() - start < duration:
+    watcher.wait(timeout=duration - (monotonic() - start))
+
+  return watcher.get_stats()
+
+
+def run(scale: float,
+        model_count: int):
+  mod_ids = [f"model{mod_idx}" for mod_idx in range(model_count)]
+  # A burst of saves on one model, then both sides changing together, then
+  # a long quiet period
+  schedule = [(t * scale, mod_id) for t, mod_id in [(20, mod_ids[0]),
+                                                     (21, mod_ids[0]),
+                                                     (22, mod_ids[0]),
+                                                     (90, mod_ids[0]),
+                                                     (91, mod_ids[-1]),
+                                                     (240, mod_ids[-1])]]
+  duration = 300 * scale
+
+  results = {}
+  for name in ['fixed 5 s', 'watcher']:
+    registry = FakeRegistry(mod_ids)
+    sched_thread = threading.Thread(target=run_schedule,
+                                    args=(registry, schedule))
+    sched_thread.start()
+    if name == 'watcher':
+      stats = watch(registry, mod_ids, scale, duration)
+    else:
+      stats = fixed_poll(registry, mod_ids, 5.0 * scale, duration)
+    sched_thread.join()
+    results[name] = {'get_model': registry.get_model_calls,
+                     'get_file': registry.get_file_calls,
+                     'wakeups': stats['wakeups'],
+                     'mean_detect_s': (stats['mean_detect_s'] or 0.0) / scale}
+
+  print(f"{model_count} models, {len(schedule)} revisions over {duration / scale:.0f} s (time scale {scale})")
+  for name, result in results.items():
+    print(f"  {name:<10} get_model {result['get_model']:4d}, get_file {result['get_file']:4d}, "
+          f"wake-ups {result['wakeups']}, mean time to detect {result['mean_detect_s']:.1f} s")
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(prog='Revision watcher benchmark')
+  parser.add_argument('--scale',
+                      type=float,
+                      default=0.02)
+  parser.add_argument('--models',
+                      type=int,
+                      default=2)
+  args = parser.parse_args()
+  run(args.scale,
+      args.models)
@@ -0,0 +1,124 @@
+import threading
+
+from datetime import datetime, timezone
+from time import monotonic
+from types import SimpleNamespace
+
+from istari_digital_client import ApiException
+from istari_digital_client.models import JobStatusName
+
+
+class FakeClient():
+  """
+  In-process stand-in for the Istari client, covering the calls made by the
+  artifact helpers (get_model, list_model_artifacts, get_revision,
+  read_contents) and the job helpers (add_job, get_job). Every call is
+  counted in self.calls.
+  """
+
+  def __init__(self,
+               page_size: int = 10,
+               job_duration: float = 0.0):
+    self.page_size = page_size
+    self.job_duration = job_duration
+    self.lock = threading.Lock()
+    self.calls = {}
+    self.models = {}
+    self.artifacts = {}
+    self.revisions = {}
+    self.contents = {}
+    self.jobs = {}
+
+  def count(self,
+            call_name: str) -> None:
+    with self.lock:
+      self.calls[call_name] = self.calls.get(call_name, 0) + 1
+
+  def make_revision(self,
+                    data: bytes = b'',
+                    sources: list = None):
+    rev_id = f"rev-{len(self.revisions)}"
+    token = SimpleNamespace(sha=f"sha-{rev_id}",
+                            salt='salt')
+    rev = SimpleNamespace(id=rev_id,
+                          created=datetime.now(timezone.utc),
+                          content_token=token,
+                          sources=sources or [],
+                          display_name=rev_id)
+    self.revisions[rev_id] = rev
+    self.contents[token.sha] = data
+    return rev
+
+  def add_model(self,
+                mod_id: str) -> None:
+    self.models[mod_id] = SimpleNamespace(id=mod_id,
+                                          name=f"{mod_id}.3dxml",
+                                          file=SimpleNamespace(id=f"file-{mod_id}",
+                                                               revisions=[self.make_revision()]))
+    self.artifacts[mod_id] = []
+
+  def add_artifact(self,
+                   mod_id: str,
+                   art_name: str,
+                   data: bytes) -> None:
+    """
+    Adds an artifact generated by the latest revision of mod_id, after any
+    already added, so it lands on the last listing page.
+    """
+    mod_rev_id = self.models[mod_id].file.revisions[-1].id
+    art_rev = self.make_revision(data,
+                                 [SimpleNamespace(revision_id=mod_rev_id)])
+    self.artifacts[mod_id].append(SimpleNamespace(name=art_name,
+                                                  revisions=[art_rev]))
+
+  def get_model(self,
+                mod_id: str):
+    self.count('get_model')
+    return self.models[mod_id]
+
+  def list_model_artifacts(self,
+                           mod_id: str,
+                           page: int = 1,
+                           size: int = None):
+    self.count('list_model_artifacts')
+    size = size or self.page_size
+    arts = self.artifacts[mod_id]
+    return SimpleNamespace(items=arts[(page - 1) * size:page * size])
+
+  def get_revision(self,
+                   rev_id: str):
+    self.count('get_revision')
+    if not rev_id in self.revisions:
+      raise ApiException(status=404)
+    return self.revisions[rev_id]
+
+  def read_contents(self,
+                    token) -> bytes:
+    self.count('read_contents')
+    return self.contents[token.sha]
+
+  def add_job(self,
+              model_id: str,
+              function: str,
+              tool_name: str = None,
+              tool_version: str = None,
+              parameters: dict = None,
+              parameters_file: str = None):
+    """
+    Creates a job that reports Running until job_duration seconds after it
+    was added and Completed from then on.
+    """
+    self.count('add_job')
+    job_id = f"job-{len(self.jobs)}"
+    self.jobs[job_id] = monotonic() + self.job_duration
+    return self.get_job(job_id, count=False)
+
+  def get_job(self,
+              job_id: str,
+              count: bool = True):
+    if count:
+      self.count('get_job')
+    done = monotonic() >= self.jobs[job_id]
+    status = JobStatusName.COMPLETED if done else JobStatusName.RUNNING
+    return SimpleNamespace(id=job_id,
+                           status=SimpleNamespace(name=status))
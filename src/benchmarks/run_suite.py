@@ -0,0 +1,290 @@
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from time import perf_counter
+
+import shared.artifact_index as artifact_index
+import shared.artifact_store as artifact_store
+import shared.job_manager as job_manager
+
+from benchmarks.fake_client import FakeClient
+from benchmarks.synthetic import make_requirements, make_parameters, parse_bound_mix, write_requirements, write_parameters
+from components import validate_requirements
+from components.validate_requirements import Bounds, find_param_reqs, get_failing_params, fix_failing_params, print_summary, parse_bnd_str, get_bounds
+from shared.artifact_index import ArtifactIndex
+from shared.artifact_store import ArtifactStore
+from shared.helpers import download_artifact, read_stored_artifact, submit_job, wait_for_job
+
+
+def time_call(func,
+              repeat: int,
+              setup=None) -> dict[str, float]:
+  """
+  Runs func repeat times, calling setup (untimed) before each run, with
+  stdout discarded. Returns the best and mean times in seconds.
+  """
+  times = []
+  for _ in range(repeat):
+    if setup is not None:
+      setup()
+    with redirect_stdout(io.StringIO()):
+      start = perf_counter()
+      func()
+      times.append(perf_counter() - start)
+
+  return {'best_s': min(times),
+          'mean_s': sum(times) / len(times)}
+
+
+def clear_parse_caches():
+  parse_bnd_str.cache_clear()
+  get_bounds.cache_clear()
+
+
+def bench_validation(work_dir: str,
+                     req_count: int,
+                     param_count: int,
+                     bound_mix: dict[str, float],
+                     repeat: int) -> dict[str, dict[str, float]]:
+  req_file = os.path.join(work_dir, 'requirements.json')
+  param_file = os.path.join(work_dir, 'parameters.json')
+  reqs_obj = make_requirements(req_count, bound_mix)
+  write_requirements(req_file, reqs_obj)
+  write_parameters(param_file, make_parameters(param_count, min(param_count, req_count)))
+  bnd_strs = [req_obj['bounds'] for req_obj in reqs_obj]
+
+  param_reqs = find_param_reqs(req_file, param_file)
+  fail_param_reqs = get_failing_params(param_reqs, batch=False)
+  results = {
+    'find_param_reqs (cold index)': time_call(lambda: find_param_reqs(req_file, param_file),
+                                              repeat,
+                                              validate_requirements.req_index_cache.clear),
+    'find_param_reqs (warm index)': time_call(lambda: find_param_reqs(req_file, param_file),
+                                              repeat),
+    'Bounds parsing (uncached)': time_call(lambda: [Bounds(bnd_str) for bnd_str in bnd_strs],
+                                           repeat,
+                                           clear_parse_caches),
+    'Bounds parsing (get_bounds)': time_call(lambda: [get_bounds(bnd_str) for bnd_str in bnd_strs],
+                                             repeat),
+    'get_failing_params (scalar)': time_call(lambda: get_failing_params(param_reqs, batch=False),
+                                             repeat),
+    'get_failing_params (batch)': time_call(lambda: get_failing_params(param_reqs, batch=True),
+                                            repeat),
+    'fix_failing_params': time_call(lambda: fix_failing_params(fail_param_reqs),
+                                    repeat),
+    'print_summary (table)': time_call(lambda: print_summary(param_reqs, mode='table'),
+                                       repeat),
+    'print_summary (failing lines)': time_call(lambda: print_summary(param_reqs, mode='lines', failures_only=True),
+                                               repeat),
+    'print_summary (jsonl)': time_call(lambda: print_summary(param_reqs, mode='jsonl'),
+                                       repeat),
+    'print_summary (csv)': time_call(lambda: print_summary(param_reqs, mode='csv'),
+                                     repeat),
+  }
+  results['find_param_reqs (cold index)']['pairs'] = len(param_reqs)
+  results['fix_failing_params']['failing'] = len(fail_param_reqs)
+  return results
+
+
+def bench_artifacts(work_dir: str,
+                    artifact_count: int,
+                    artifact_mb: float,
+                    repeat: int) -> dict[str, dict[str, float]]:
+  """
+  Times download_artifact for an artifact on the last listing page, with an
+  empty artifact index, with the index already holding the artifact and with
+  the artifact also in the local store, and the registry-free store lookup.
+  """
+  client = FakeClient()
+  client.add_model('model')
+  for art_idx in range(artifact_count - 1):
+    client.add_artifact('model', f"other{art_idx}.json", b'{}')
+  client.add_artifact('model', 'target.json', os.urandom(int(artifact_mb * 1e6)))
+  dest_file = os.path.join(work_dir, 'target.json')
+  index_file = os.path.join(work_dir, 'artifact_index.json')
+  store_dir = os.path.join(work_dir, 'artifacts')
+
+  # Every run starts without the destination file, since replacing an
+  # existing file costs more than the rest of the download
+  def remove_dest():
+    if os.path.exists(dest_file):
+      os.remove(dest_file)
+
+  def reset_store():
+    remove_dest()
+    shutil.rmtree(store_dir, ignore_errors=True)
+    artifact_store.artifact_store = ArtifactStore(store_dir)
+
+  def reset_index():
+    reset_store()
+    if os.path.exists(index_file):
+      os.remove(index_file)
+    artifact_index.artifact_index = ArtifactIndex(index_file)
+
+  results = {}
+  for name, setup in [('download_artifact (cold index)', reset_index),
+                      ('download_artifact (warm index)', reset_store),
+                      ('download_artifact (stored)', remove_dest)]:
+    client.calls.clear()
+    results[name] = time_call(lambda: download_artifact('model', 'target.json', dest_file, client),
+                              repeat,
+                              setup)
+    results[name]['list_calls_per_run'] = client.calls.get('list_model_artifacts', 0) / repeat
+    results[name]['mb'] = artifact_mb
+
+  mod_rev_id = client.models['model'].file.revisions[-1].id
+  client.calls.clear()
+  results['read_stored_artifact'] = time_call(lambda: read_stored_artifact('model', mod_rev_id, 'target.json'),
+                                              repeat)
+  results['read_stored_artifact']['registry_calls_per_run'] = sum(client.calls.values()) / repeat
+  results['read_stored_artifact']['mb'] = artifact_mb
+
+  artifact_index.artifact_index = None
+  artifact_store.artifact_store = None
+  return results
+
+
+def bench_jobs(job_durations: list[float]) -> dict[str, dict[str, float]]:
+  """
+  Times submit_job plus wait_for_job for fake jobs of each duration. The
+  latency is how long after the job finished its completion was seen.
+  """
+  results = {}
+  for job_duration in job_durations:
+    client = FakeClient(job_duration=job_duration)
+    client.add_model('model')
+    job_manager.job_manager = None
+    with redirect_stdout(io.StringIO()):
+      start = perf_counter()
+      job = submit_job('model', '@istari:extract', 'tool', client=client)
+      wait_for_job(job, client)
+      elapsed = perf_counter() - start
+    results[f"wait_for_job ({job_duration:g} s job)"] = {'best_s': elapsed,
+                                                         'mean_s': elapsed,
+                                                         'latency_s': elapsed - job_duration,
+                                                         'polls': client.calls.get('get_job', 0)}
+  return results
+
+
+def bench_startup(work_dir: str,
+                  repeat: int) -> dict[str, dict[str, float]]:
+  """
+  Times fresh interpreter processes: bare startup, importing the validation
+  module and the workflow, and the offline validation command on the
+  files written by bench_validation.
+  """
+  src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  report_file = os.path.join(work_dir, 'report.jsonl')
+  cmds = {
+    'startup (python)': ['-c', 'pass'],
+    'startup (import validate_requirements)': ['-c', 'import components.validate_requirements'],
+    'startup (import execute_workflow)': ['-c', 'import execute_workflow'],
+    'startup (offline validation)': ['-m', 'components.validate_requirements',
+                                     '--requirements', os.path.join(work_dir, 'requirements.json'),
+                                     '--parameters', os.path.join(work_dir, 'parameters.json'),
+                                     '--report', 'jsonl',
+                                     '--report_file', report_file],
+  }
+  results = {}
+  for name, cmd in cmds.items():
+    results[name] = time_call(lambda: subprocess.run([sys.executable] + cmd,
+                                                     cwd=src_dir,
+                                                     capture_output=True),
+                              repeat)
+  return results
+
+
+def get_commit() -> str:
+  try:
+    return subprocess.run(['git', 'rev-parse', 'HEAD'],
+                          capture_output=True,
+                          text=True,
+                          check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+
+def print_results(results: dict[str, dict[str, float]],
+                  baseline: dict[str, dict[str, float]] = None):
+  for name, result in results.items():
+    line = f"  {name:<40}{result['best_s'] * 1000:11.2f} ms"
+    if baseline is not None and name in baseline:
+      line += f"  ({result['best_s'] / baseline[name]['best_s']:.2f}x baseline)"
+    print(line)
+
+
+def run(args):
+  bound_mix = parse_bound_mix(args.bound_mix)
+  with tempfile.TemporaryDirectory() as work_dir:
+    results = bench_validation(work_dir, args.reqs, args.params, bound_mix, args.repeat)
+    results.update(bench_startup(work_dir, args.repeat))
+    results.update(bench_artifacts(work_dir, args.artifacts, args.artifact_mb, args.repeat))
+  results.update(bench_jobs(args.job_durations))
+
+  report = {'commit': get_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'config': {'reqs': args.reqs,
+                       'params': args.params,
+                       'bound_mix': bound_mix,
+                       'artifacts': args.artifacts,
+                       'artifact_mb': args.artifact_mb,
+                       'job_durations': args.job_durations,
+                       'repeat': args.repeat},
+            'results': results}
+
+  baseline = None
+  if args.compare:
+    with open(args.compare, 'r') as fin:
+      baseline = json.load(fin)['results']
+  print(f"{args.reqs} requirements, {args.params} parameters, best of {args.repeat}")
+  print_results(results, baseline)
+
+  if args.output:
+    out_dir = os.path.dirname(args.output)
+    if out_dir:
+      os.makedirs(out_dir, exist_ok=True)
+    with open(args.output, 'w') as fout:
+      json.dump(report, fout, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(prog='Validation and artifact pipeline benchmarks')
+  parser.add_argument('--reqs',
+                      type=int,
+                      default=20000)
+  parser.add_argument('--params',
+                      type=int,
+                      default=20000)
+  parser.add_argument('--bound_mix',
+                      default='',
+                      help="Bound type weights, e.g. 'range=4,less=1,greater_equal=1' (default: equal)")
+  parser.add_argument('--artifacts',
+                      type=int,
+                      default=200,
+                      help='Number of artifacts listed for the fake model')
+  parser.add_argument('--artifact_mb',
+                      type=float,
+                      default=16)
+  parser.add_argument('--job_durations',
+                      type=float,
+                      nargs='*',
+                      default=[0.0, 2.0])
+  parser.add_argument('--repeat',
+                      type=int,
+                      default=5)
+  parser.add_argument('--output',
+                      help='Write results as JSON to this file')
+  parser.add_argument('--compare',
+                      help='Results JSON of an earlier run to compare against')
+  run(parser.parse_args())
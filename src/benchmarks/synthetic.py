@@ -0,0 +1,97 @@
+import json
+import random
+
+
+# Bound string formats by bound type, matching what Cameo exports
+BOUND_FORMATS = {'range': '[{lo};{hi}]',
+                 'less': '<{hi}',
+                 'less_equal': '<={hi}',
+                 'greater': '>{lo}',
+                 'greater_equal': '>={lo}',
+                 'equal': '={lo}'}
+
+
+def parse_bound_mix(mix_str: str) -> dict[str, float]:
+  """
+  Parses a bound-type mix such as 'range=4,less=1' into weights. Types left
+  out get no weight; an empty string weights every type equally.
+  """
+  if not mix_str:
+    return {bnd_type: 1.0 for bnd_type in BOUND_FORMATS}
+
+  bound_mix = {}
+  for item in mix_str.split(','):
+    bnd_type, weight = item.split('=')
+    if not bnd_type.strip() in BOUND_FORMATS:
+      raise ValueError(f"Unknown bound type: {bnd_type}")
+    bound_mix[bnd_type.strip()] = float(weight)
+  return bound_mix
+
+
+def make_bound(rnd: random.Random,
+               bound_mix: dict[str, float]) -> str:
+  lo = round(rnd.uniform(0, 100), 2)
+  hi = round(lo + rnd.uniform(0, 100), 2)
+  bnd_type = rnd.choices(list(bound_mix), weights=list(bound_mix.values()))[0]
+  return BOUND_FORMATS[bnd_type].format(lo=lo, hi=hi)
+
+
+def make_requirements(req_count: int,
+                      bound_mix: dict[str, float] = None,
+                      seed: int = 0) -> list[dict[str, object]]:
+  """
+  Returns a synthetic Cameo requirements list. Requirement i constrains
+  parameter Param<i>.
+  """
+  rnd = random.Random(seed)
+  bound_mix = bound_mix or parse_bound_mix('')
+  return [{'qualified_name': f"System::Subsystem{req_idx % 50}::Req{req_idx}::Param{req_idx}",
+           'bounds': make_bound(rnd, bound_mix)}
+          for req_idx in range(req_count)]
+
+
+def make_parameters(param_count: int,
+                    match_count: int = None,
+                    part_size: int = 100,
+                    seed: int = 0) -> list[dict[str, object]]:
+  """
+  Returns a synthetic 3DX parameters list in parts of part_size. The first
+  match_count parameters (all by default) are named after a requirement
+  from make_requirements; the rest match nothing.
+  """
+  rnd = random.Random(seed + 1)
+  match_count = param_count if match_count is None else match_count
+  params_obj = []
+  for part_start in range(0, param_count, part_size):
+    params = []
+    for param_idx in range(part_start, min(part_start + part_size, param_count)):
+      param_name = f"Param{param_idx}" if param_idx < match_count else f"Unmatched{param_idx}"
+      params.append({'name': f"Part{part_start // part_size}\\{param_name}",
+                     'value': f"{round(rnd.uniform(-50, 250), 2)}mm",
+                     'units': 'mm'})
+    params_obj.append({'parameters': params})
+  return params_obj
+
+
+def make_param_reqs(pair_count: int,
+                    bound_mix: dict[str, float] = None,
+                    seed: int = 0) -> list[tuple[dict[str, object], dict[str, object]]]:
+  """
+  Returns pair_count matched (param, req) pairs, one requirement each.
+  """
+  reqs_obj = make_requirements(pair_count, bound_mix, seed)
+  params = [param for param_obj in make_parameters(pair_count, seed=seed)
+            for param in param_obj['parameters']]
+  return list(zip(params, reqs_obj))
+
+
+def write_requirements(req_file: str,
+                       reqs_obj: list[dict[str, object]]) -> None:
+  with open(req_file, 'w', encoding='Windows-1252') as fout:
+    json.dump(reqs_obj, fout)
+
+
+def write_parameters(param_file: str,
+                     params_obj: list[dict[str, object]]) -> None:
+  with open(param_file, 'w') as fout:
+    json.dump(params_obj, fout)
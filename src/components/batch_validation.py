@@ -0,0 +1,111 @@
+import numpy as np
+
+from components.param_req_pairs import ParamReqPairs
+from components.validate_requirements import BoundType, get_bounds, parse_param_str
+
+
+BOUND_TYPE_CODES = {bnd_type: bnd_type.value for bnd_type in BoundType}
+
+
+class BatchValidator():
+  """
+  Struct-of-arrays view of matched parameter/requirement pairs.
+
+  Every pair is reduced to its parameter value, lower and upper bound and an
+  integer bound type code, so pass/fail and corrected values for the whole
+  set are computed with a handful of array operations instead of one Python
+  call per pair. Missing bounds are stored as NaN.
+  """
+
+  def __init__(self,
+               param_reqs: list[tuple[dict[str, object], dict[str, object]]]):
+    self.param_reqs = param_reqs
+
+    # Look up each distinct parameter value and bounds string once, through
+    # the same parse caches as the scalar checks, then spread the parsed rows
+    # over the pairs
+    if isinstance(param_reqs, ParamReqPairs):
+      val_strs = param_reqs.param_values
+      bnd_strs = param_reqs.req_bounds
+      param_rows = np.frombuffer(param_reqs.param_rows, dtype=np.intc)
+      req_rows = np.frombuffer(param_reqs.req_rows, dtype=np.intc)
+    else:
+      val_rows = {}
+      bnd_rows = {}
+      param_rows = np.fromiter((val_rows.setdefault(param_obj['value'], len(val_rows)) for param_obj, _ in param_reqs),
+                               dtype=np.intc,
+                               count=len(param_reqs))
+      req_rows = np.fromiter((bnd_rows.setdefault(req_obj['bounds'], len(bnd_rows)) for _, req_obj in param_reqs),
+                             dtype=np.intc,
+                             count=len(param_reqs))
+      val_strs = list(val_rows)
+      bnd_strs = list(bnd_rows)
+
+    parsed_vals = list(map(parse_param_str, val_strs))
+    bnds = list(map(get_bounds, bnd_strs))
+    self.values = np.array([param_val for param_val, _ in parsed_vals], dtype=np.float64)[param_rows]
+    self.lower = np.array([bnd.lower for bnd in bnds], dtype=np.float64)[req_rows]
+    self.upper = np.array([bnd.upper for bnd in bnds], dtype=np.float64)[req_rows]
+    self.types = np.array([BOUND_TYPE_CODES[bnd.type] for bnd in bnds], dtype=np.int8)[req_rows]
+    # Units are only needed to format corrected values
+    self.row_units = [param_units for _, param_units in parsed_vals]
+    self.param_rows = param_rows
+
+  def type_masks(self) -> list[np.ndarray]:
+    return [self.types == BOUND_TYPE_CODES[bnd_type] for bnd_type in BoundType]
+
+  def is_satisfied(self) -> np.ndarray:
+    """
+    Returns a boolean array, True where the pair satisfies its bounds.
+    """
+    val = self.values
+    lower = self.lower
+    upper = self.upper
+    conds = {
+      BoundType.RANGE: (val >= lower) & (val <= upper),
+      BoundType.LESS_THAN: val < upper,
+      BoundType.LESS_THAN_EQUAL: val <= upper,
+      BoundType.GREATER_THAN: val > lower,
+      BoundType.GREATER_THAN_EQUAL: val >= lower,
+      BoundType.EQUAL_TO: val == lower,
+    }
+
+    return np.select(self.type_masks(),
+                     [conds[bnd_type] for bnd_type in BoundType],
+                     default=False)
+
+  def get_nearest_passing_values(self) -> np.ndarray:
+    """
+    Vectorized Bounds.get_nearest_passing_value over every pair.
+    """
+    val = self.values
+    lower = self.lower
+    upper = self.upper
+    fixes = {
+      BoundType.RANGE: np.where(np.abs(val - lower) < np.abs(val - upper),
+                                lower,
+                                upper),
+      BoundType.LESS_THAN: np.nextafter(upper, -np.inf),
+      BoundType.LESS_THAN_EQUAL: upper,
+      BoundType.GREATER_THAN: np.nextafter(lower, np.inf),
+      BoundType.GREATER_THAN_EQUAL: lower,
+      BoundType.EQUAL_TO: lower,
+    }
+    fixed = np.select(self.type_masks(),
+                      [fixes[bnd_type] for bnd_type in BoundType],
+                      default=val)
+
+    return np.where(self.is_satisfied(), val, fixed)
+
+  def get_failing_params(self) -> list[tuple[dict[str, object], dict[str, object]]]:
+    fail_idxs = np.flatnonzero(~self.is_satisfied())
+    return [self.param_reqs[pair_idx] for pair_idx in fail_idxs.tolist()]
+
+  def get_value_strs(self) -> list[str]:
+    """
+    Returns the nearest passing value of every pair formatted like
+    Parameter.get_value_str().
+    """
+    new_vals = self.get_nearest_passing_values().tolist()
+    row_units = self.row_units
+    return [f"{new_val}{row_units[param_row]}" for new_val, param_row in zip(new_vals, self.param_rows.tolist())]
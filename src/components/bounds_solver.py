@@ -0,0 +1,106 @@
+import math
+
+from prettytable import PrettyTable
+from components.validate_requirements import Bounds, get_bounds, get_column_header_color, parse_param_str
+from shared.helpers import format_str
+from shared.metrics import timed
+from shared.constants import RED_COLOR
+
+
+def intersect_bounds(bnds: list[Bounds]) -> tuple[float, bool, float, bool]:
+  """
+  Returns the intersection of every bound as (lower, lower closed, upper,
+  upper closed). The intersection may be empty.
+  """
+  lower, lower_closed, upper, upper_closed = -math.inf, False, math.inf, False
+  for bnd in bnds:
+    bnd_lower, bnd_lower_closed, bnd_upper, bnd_upper_closed = bnd.get_interval()
+    if bnd_lower > lower or (bnd_lower == lower and not bnd_lower_closed):
+      lower, lower_closed = bnd_lower, bnd_lower_closed
+    if bnd_upper < upper or (bnd_upper == upper and not bnd_upper_closed):
+      upper, upper_closed = bnd_upper, bnd_upper_closed
+
+  return lower, lower_closed, upper, upper_closed
+
+
+def get_passing_value(val: float,
+                      interval: tuple[float, bool, float, bool]) -> float:
+  """
+  Returns the value nearest val inside the interval, or None if no float
+  lies inside it. Open ends are replaced by the next float inward.
+  """
+  lower, lower_closed, upper, upper_closed = interval
+  lowest = lower if lower_closed else math.nextafter(lower, math.inf)
+  highest = upper if upper_closed else math.nextafter(upper, -math.inf)
+  if lowest > highest:
+    return None
+
+  return min(max(val, lowest), highest)
+
+
+@timed('fix')
+def solve_failing_params(param_reqs: list[tuple[dict[str, object], dict[str, object]]],
+                         fail_param_reqs: list[tuple[dict[str, object], dict[str, object]]]) -> tuple[list[dict[str, str]], list[dict[str, object]]]:
+  """
+  Picks one new value per failing parameter that satisfies every requirement
+  matched to that parameter, including the ones it currently passes.
+
+  Returns (new_params, conflicts): one {'name', 'value', 'units'} entry per
+  parameter that can be fixed, and one {'name', 'value', 'bounds'} entry per
+  parameter whose requirements have no value in common.
+  """
+  fail_names = set(param_obj['name'] for param_obj, _ in fail_param_reqs)
+  param_grps = {}
+  for param_obj, req_obj in param_reqs:
+    param_name = param_obj['name']
+    if param_name in fail_names:
+      param_grp = param_grps.setdefault(param_name, (param_obj, []))
+      if not req_obj['bounds'] in param_grp[1]:
+        param_grp[1].append(req_obj['bounds'])
+
+  new_params = []
+  conflicts = []
+  for param_name, (param_obj, bnd_strs) in param_grps.items():
+    param_val, param_units = parse_param_str(param_obj['value'])
+    new_val = get_passing_value(param_val,
+                                intersect_bounds([get_bounds(bnd_str) for bnd_str in bnd_strs]))
+    if new_val is None:
+      conflicts.append({'name': param_name,
+                        'value': param_obj['value'],
+                        'bounds': bnd_strs})
+    else:
+      new_params.append({'name': param_name,
+                         'value': f"{new_val}{param_units}",
+                         'units': param_obj['units']})
+
+  print_solution(new_params,
+                 conflicts)
+  return new_params, conflicts
+
+
+def print_solution(new_params: list[dict[str, str]],
+                   conflicts: list[dict[str, object]]):
+  header_color = get_column_header_color()
+  if len(new_params) > 0:
+    pt = PrettyTable()
+    pt.field_names = [format_str('CAD Parameter', header_color, 1),
+                      format_str('New Value', header_color, 1)]
+    for new_param in new_params:
+      pt.add_row([new_param['name'],
+                  new_param['value']])
+    pt.align = 'l'
+    print(pt)
+
+  if len(conflicts) > 0:
+    msg = f"{len(conflicts)} parameter(s) have requirements that no value satisfies"
+    print(format_str(msg, RED_COLOR, 1))
+    pt = PrettyTable()
+    pt.field_names = [format_str('CAD Parameter', header_color, 1),
+                      format_str('Value', header_color, 1),
+                      format_str('Conflicting Bounds', header_color, 1)]
+    for conflict in conflicts:
+      pt.add_row([conflict['name'],
+                  conflict['value'],
+                  ', '.join(conflict['bounds'])])
+    pt.align = 'l'
+    print(pt)
@@ -3,26 +3,39 @@ import os
 from time import sleep
 from istari_digital_client import Client
 
-from shared.helpers import get_client, submit_job, wait_for_job, download_artifact
+from shared.metrics import get_metrics, timed
+from shared.helpers import get_client, submit_job, wait_for_job, download_artifact, read_artifact
 from shared.constants import CAD_MODEL_ID, PARAM_FILE_NAME, CAD_TOOL_NAME
 
 
+@timed('extract')
 def extract_cad_data(client: Client,
                      cad_mod_id,
-                     param_file_name: str):
+                     param_file_name: str,
+                     save_file: bool = True) -> bytes:
   print('Submitting job to extract 3DX model data ...')
 
   job = submit_job(model_id = cad_mod_id,
                    function = '@istari:extract',
-                   tool_name = CAD_TOOL_NAME)
+                   tool_name = CAD_TOOL_NAME,
+                   client = client)
   print(f"Job submitted with ID: {job.id}")
 
-  job = wait_for_job(job)
+  job = wait_for_job(job,
+                     client)
   print(f"Job Complete [{job.status.name}]")
   
-  sleep(5)
-  download_artifact(cad_mod_id,
-                    param_file_name)
+  with get_metrics().span('extract_wait'):
+    sleep(5)
+  if save_file:
+    download_artifact(cad_mod_id,
+                      param_file_name,
+                      client = client)
+    return None
+
+  return read_artifact(cad_mod_id,
+                       param_file_name,
+                       client)
 
 
 if __name__ == '__main__':
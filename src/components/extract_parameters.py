@@ -1,34 +1,40 @@
-import os
-
 from time import sleep
 from istari_digital_client import Client
 
-from shared.helpers import get_client, submit_job, wait_for_job, download_artifact
+from shared.metrics import get_metrics, timed
+from shared.helpers import get_client, submit_job, wait_for_job, download_artifact, read_artifact
 from shared.constants import CAD_MODEL_ID, PARAM_FILE_NAME, CAD_TOOL_NAME
 
 
+@timed('extract')
 def extract_parameters(client: Client,
                        cad_mod_id,
-                       param_file_name: str):
+                       param_file_name: str,
+                       save_file: bool = True) -> bytes:
   print('Submitting job to extract 3DX model parameters ...')
 
-  input_file = 'input.json'
-  with open(input_file, 'w') as fout:
-    fout.write('{"full_extract": false}')
-
   job = submit_job(model_id = cad_mod_id,
                    function = '@istari:extract_parameters',
                    tool_name = CAD_TOOL_NAME,
-                   params_file = input_file)
+                   client = client,
+                   params = {'full_extract': False})
   print(f"Job submitted with ID: {job.id}")
-  os.remove(input_file)
 
-  job = wait_for_job(job)
+  job = wait_for_job(job,
+                     client)
   print(f"Job Complete [{job.status.name}]")
   
-  sleep(5)
-  download_artifact(cad_mod_id,
-                    param_file_name)
+  with get_metrics().span('extract_wait'):
+    sleep(5)
+  if save_file:
+    download_artifact(cad_mod_id,
+                      param_file_name,
+                      client = client)
+    return None
+
+  return read_artifact(cad_mod_id,
+                       param_file_name,
+                       client)
 
 
 if __name__ == '__main__':
@@ -1,26 +1,39 @@
 from istari_digital_client import Client
 
-from shared.helpers import get_client, submit_job, wait_for_job, download_artifact
+from shared.metrics import timed
+from shared.helpers import get_client, submit_job, wait_for_job, download_artifact, read_artifact
 from shared.constants import *
 
 
+@timed('extract')
 def extract_requirements(client: Client,
                          cam_mod_id: str,
-                         req_file_name: str):
+                         req_file_name: str,
+                         save_file: bool = True) -> bytes:
   print('Submitting job to extract Cameo model requirements ...')
   job = submit_job(model_id = cam_mod_id,
                    function = '@istari:extract',
                    tool_name = CAMEO_TOOL_NAME,
-                   tool_ver = CAMEO_VERSION)
+                   tool_ver = CAMEO_VERSION,
+                   client = client)
   print(f"Job submitted with ID: {job.id}")
   
-  wait_for_job(job)
+  job = wait_for_job(job,
+                     client)
   print(f"Job Complete [{job.status.name}]")
 
   print("Downloading requirements artifact ...")
-  download_artifact(cam_mod_id,
-                    req_file_name)
+  if save_file:
+    download_artifact(cam_mod_id,
+                      req_file_name,
+                      client = client)
+    req_data = None
+  else:
+    req_data = read_artifact(cam_mod_id,
+                             req_file_name,
+                             client)
   print('Requirements artifact downloaded')
+  return req_data
 
 
 if __name__ == '__main__':
@@ -0,0 +1,218 @@
+from bisect import bisect_left, insort
+
+from components.validate_requirements import check_requirement
+from shared.metrics import timed
+
+
+def group_reqs(reqs_obj: list[dict[str, object]]) -> dict[str, list[tuple[int, dict[str, object]]]]:
+  """
+  Groups requirements by stripped qualified name, keeping each requirement's
+  position in the file.
+  """
+  req_grps = {}
+  for req_pos, req_obj in enumerate(reqs_obj):
+    req_grps.setdefault(req_obj['qualified_name'].strip(), []).append((req_pos, req_obj))
+  return req_grps
+
+
+def group_params(params_obj: list[dict[str, object]]) -> dict[str, list[tuple[int, dict[str, object]]]]:
+  """
+  Groups parameters by name, keeping each parameter's position in the file.
+  """
+  param_grps = {}
+  param_pos = 0
+  for param_obj in params_obj:
+    params = param_obj['parameters']
+    if not params is None:
+      for param in params:
+        param_grps.setdefault(param['name'], []).append((param_pos, param))
+        param_pos += 1
+  return param_grps
+
+
+def get_param_suffix(param_key: str) -> str:
+  return param_key.split('\\')[-1].strip()
+
+
+def diff_groups(old_grps: dict[str, list],
+                new_grps: dict[str, list]) -> tuple[set[str], set[str], set[str]]:
+  """
+  Returns the (added, removed, changed) group keys between two groupings.
+  """
+  added = new_grps.keys() - old_grps.keys()
+  removed = old_grps.keys() - new_grps.keys()
+  changed = set()
+  for grp_key, new_grp in new_grps.items():
+    old_grp = old_grps.get(grp_key)
+    if old_grp is None or len(old_grp) != len(new_grp):
+      if old_grp is not None:
+        changed.add(grp_key)
+      continue
+    for (_, old_obj), (_, new_obj) in zip(old_grp, new_grp):
+      if old_obj is not new_obj and old_obj != new_obj:
+        changed.add(grp_key)
+        break
+
+  return set(added), set(removed), changed
+
+
+class IncrementalValidator():
+  """
+  Keeps the requirements, parameters, matches and check results of the last
+  validation in memory and, given a new pair of artifacts, only re-matches
+  and re-checks what changed.
+
+  Requirements are diffed by qualified name and parameters by name. Matching
+  uses a sorted list of reversed requirement names, updated in place, for
+  parameter lookups and a parameter-suffix map for requirement lookups, so
+  the matching and checking work is proportional to the size of the change.
+  get_param_reqs() returns the same pairs, in the same order, as
+  match_param_reqs() on the full artifacts.
+  """
+
+  def __init__(self):
+    self.req_grps = {}
+    self.param_grps = {}
+    self.rev_req_keys = []
+    self.params_by_suffix = {}
+    self.matches = {}
+    self.req_matches = {}
+    self.checks = {}
+
+  @timed('incremental_update')
+  def update(self,
+             reqs_obj: list[dict[str, object]],
+             params_obj: list[dict[str, object]]) -> dict[str, dict[str, int]]:
+    """
+    Brings the validator up to date with new artifacts and returns the delta:
+    added/removed/changed requirement and parameter counts, the number of
+    matched pairs before and after, and how many pairs were re-checked.
+    """
+    new_req_grps = group_reqs(reqs_obj)
+    new_param_grps = group_params(params_obj)
+    reqs_added, reqs_removed, reqs_changed = diff_groups(self.req_grps, new_req_grps)
+    params_added, params_removed, params_changed = diff_groups(self.param_grps, new_param_grps)
+
+    pair_count = self.get_pair_count()
+
+    # Drop everything involving removed or changed entries
+    for param_key in params_removed | params_changed:
+      self.drop_param(param_key)
+    for req_key in reqs_removed | reqs_changed:
+      self.drop_req(req_key)
+
+    self.req_grps = new_req_grps
+    self.param_grps = new_param_grps
+    for req_key in reqs_added | reqs_changed:
+      insort(self.rev_req_keys, req_key[::-1])
+    for param_key in params_added | params_changed:
+      self.params_by_suffix.setdefault(get_param_suffix(param_key), set()).add(param_key)
+
+    # Re-match and re-check everything involving added or changed entries
+    checked_pairs = set()
+    for param_key in params_added | params_changed:
+      for req_key in self.find_reqs(get_param_suffix(param_key)):
+        self.add_match(param_key, req_key, checked_pairs)
+    for req_key in reqs_added | reqs_changed:
+      for suffix_idx in range(len(req_key) + 1):
+        for param_key in self.params_by_suffix.get(req_key[suffix_idx:], ()):
+          self.add_match(param_key, req_key, checked_pairs)
+
+    rechecked = sum(len(self.checks[pair_key]) for pair_key in checked_pairs)
+    new_pair_count = self.get_pair_count()
+    return {'requirements': {'added': len(reqs_added),
+                             'removed': len(reqs_removed),
+                             'changed': len(reqs_changed)},
+            'parameters': {'added': len(params_added),
+                           'removed': len(params_removed),
+                           'changed': len(params_changed)},
+            'pairs': {'before': pair_count,
+                      'after': new_pair_count,
+                      'rechecked': rechecked}}
+
+  def find_reqs(self,
+                suffix: str) -> list[str]:
+    rev_suffix = suffix[::-1]
+    lo = bisect_left(self.rev_req_keys, rev_suffix)
+    hi = bisect_left(self.rev_req_keys, rev_suffix + chr(0x10FFFF), lo)
+    return [rev_key[::-1] for rev_key in self.rev_req_keys[lo:hi]]
+
+  def add_match(self,
+                param_key: str,
+                req_key: str,
+                checked_pairs: set[tuple[str, str]]) -> None:
+    pair_key = (param_key, req_key)
+    if pair_key in checked_pairs:
+      return
+    checked_pairs.add(pair_key)
+    self.matches.setdefault(param_key, set()).add(req_key)
+    self.req_matches.setdefault(req_key, set()).add(param_key)
+    self.checks[pair_key] = [check_requirement(param, req_obj)
+                             for _, param in self.param_grps[param_key]
+                             for _, req_obj in self.req_grps[req_key]]
+
+  def drop_param(self,
+                 param_key: str) -> None:
+    for req_key in self.matches.pop(param_key, ()):
+      self.req_matches[req_key].discard(param_key)
+      del self.checks[(param_key, req_key)]
+    suffix = get_param_suffix(param_key)
+    suffix_params = self.params_by_suffix.get(suffix)
+    if suffix_params is not None:
+      suffix_params.discard(param_key)
+      if len(suffix_params) == 0:
+        del self.params_by_suffix[suffix]
+
+  def drop_req(self,
+               req_key: str) -> None:
+    for param_key in self.req_matches.pop(req_key, ()):
+      self.matches[param_key].discard(req_key)
+      del self.checks[(param_key, req_key)]
+    rev_key = req_key[::-1]
+    rev_idx = bisect_left(self.rev_req_keys, rev_key)
+    if rev_idx < len(self.rev_req_keys) and self.rev_req_keys[rev_idx] == rev_key:
+      del self.rev_req_keys[rev_idx]
+
+  def get_pair_count(self) -> int:
+    return sum(len(pair_checks) for pair_checks in self.checks.values())
+
+  @timed('incremental_pairs')
+  def get_checked_pairs(self,
+                        failing_only: bool = False) -> tuple[list[tuple[dict[str, object], dict[str, object]]], list[bool]]:
+    """
+    Returns the matched pairs, in match_param_reqs() order, and whether each
+    one satisfies its requirement.
+    """
+    pairs = []
+    for (param_key, req_key), pair_checks in self.checks.items():
+      req_grp = self.req_grps[req_key]
+      check_idx = 0
+      for param_pos, param in self.param_grps[param_key]:
+        for req_pos, req_obj in req_grp:
+          passed = pair_checks[check_idx]
+          if not failing_only or not passed:
+            pairs.append((param_pos, req_pos, param, req_obj, passed))
+          check_idx += 1
+
+    pairs.sort(key=lambda pair: (pair[0], pair[1]))
+    return ([(param, req_obj) for _, _, param, req_obj, _ in pairs],
+            [passed for _, _, _, _, passed in pairs])
+
+  def get_pairs(self,
+                failing_only: bool) -> list[tuple[dict[str, object], dict[str, object]]]:
+    return self.get_checked_pairs(failing_only)[0]
+
+  def get_param_reqs(self) -> list[tuple[dict[str, object], dict[str, object]]]:
+    return self.get_pairs(False)
+
+  def get_failing_params(self) -> list[tuple[dict[str, object], dict[str, object]]]:
+    return self.get_pairs(True)
+
+
+def format_delta(delta: dict[str, dict[str, int]]) -> str:
+  req_delta = delta['requirements']
+  param_delta = delta['parameters']
+  pair_delta = delta['pairs']
+  return (f"Requirements +{req_delta['added']} -{req_delta['removed']} ~{req_delta['changed']}, "
+          f"parameters +{param_delta['added']} -{param_delta['removed']} ~{param_delta['changed']}, "
+          f"pairs {pair_delta['before']} -> {pair_delta['after']} ({pair_delta['rechecked']} re-checked)")
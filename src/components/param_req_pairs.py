@@ -0,0 +1,138 @@
+import sys
+
+from array import array
+from collections.abc import Mapping
+
+
+def intern_str(val: object) -> object:
+  return sys.intern(val) if type(val) is str else val
+
+
+class PairView(Mapping):
+  """
+  Read/write dict-like view of one parameter or requirement row of a
+  ParamReqPairs, so code written against the parsed JSON dicts works on it
+  unchanged. Writes go to the shared row, as they would on the dict.
+  """
+  __slots__ = ('pairs', 'row')
+  FIELDS = {}
+
+  def __init__(self,
+               pairs: 'ParamReqPairs',
+               row: int):
+    self.pairs = pairs
+    self.row = row
+
+  def __getitem__(self, key: str) -> object:
+    return getattr(self.pairs, self.FIELDS[key])[self.row]
+
+  def __setitem__(self, key: str, val: object):
+    getattr(self.pairs, self.FIELDS[key])[self.row] = intern_str(val) if key != 'value' else val
+
+  def __iter__(self):
+    return iter(self.FIELDS)
+
+  def __len__(self) -> int:
+    return len(self.FIELDS)
+
+  def __repr__(self) -> str:
+    return repr(dict(self))
+
+
+class ParamView(PairView):
+  __slots__ = ()
+  FIELDS = {'name': 'param_names',
+            'value': 'param_values',
+            'units': 'param_units'}
+
+
+class ReqView(PairView):
+  __slots__ = ()
+  FIELDS = {'qualified_name': 'req_names',
+            'bounds': 'req_bounds'}
+
+
+class ParamReqPairs():
+  """
+  Compact, struct-of-arrays store of matched parameter/requirement pairs.
+
+  Each matched parameter and requirement is stored once, as a row of
+  parallel lists holding only the fields validation uses, with names, units
+  and bounds interned. A pair is then just two row numbers in int arrays.
+  Every row also keeps the index of its source object: the parameter's
+  position among all parameters in the parameters file, and the
+  requirement's position in the requirements file.
+
+  Indexing and iteration yield (ParamView, ReqView) tuples that behave like
+  the JSON dicts, so it can be passed wherever a list of (param, req) pairs
+  is accepted.
+  """
+  __slots__ = ('param_names', 'param_values', 'param_units', 'param_srcs',
+               'req_names', 'req_bounds', 'req_srcs',
+               'param_rows', 'req_rows', 'req_row_idx')
+
+  def __init__(self):
+    self.param_names = []
+    self.param_values = []
+    self.param_units = []
+    self.param_srcs = array('i')
+    self.req_names = []
+    self.req_bounds = []
+    self.req_srcs = array('i')
+    self.param_rows = array('i')
+    self.req_rows = array('i')
+    self.req_row_idx = {}
+
+  def add_param(self,
+                param_src: int,
+                param_obj: dict[str, object]) -> int:
+    self.param_names.append(intern_str(param_obj['name']))
+    self.param_values.append(param_obj['value'])
+    self.param_units.append(intern_str(param_obj.get('units')))
+    self.param_srcs.append(param_src)
+    return len(self.param_srcs) - 1
+
+  def add_pair(self,
+               param_row: int,
+               req_src: int,
+               req_obj: dict[str, object]) -> None:
+    """
+    Pairs parameter row param_row with the requirement at source index
+    req_src, adding a row for the requirement the first time it is seen.
+    """
+    req_row = self.req_row_idx.get(req_src)
+    if req_row is None:
+      req_row = self.req_row_idx[req_src] = len(self.req_srcs)
+      self.req_names.append(intern_str(req_obj['qualified_name']))
+      self.req_bounds.append(intern_str(req_obj['bounds']))
+      self.req_srcs.append(req_src)
+    self.param_rows.append(param_row)
+    self.req_rows.append(req_row)
+
+  def finish(self) -> 'ParamReqPairs':
+    """
+    Drops the lookup table used while adding pairs.
+    """
+    self.req_row_idx = None
+    return self
+
+  def __len__(self) -> int:
+    return len(self.param_rows)
+
+  def __getitem__(self,
+                  pair_idx: int) -> tuple[ParamView, ReqView]:
+    return (ParamView(self, self.param_rows[pair_idx]),
+            ReqView(self, self.req_rows[pair_idx]))
+
+  def __iter__(self):
+    for param_row, req_row in zip(self.param_rows, self.req_rows):
+      yield (ParamView(self, param_row),
+             ReqView(self, req_row))
+
+  def get_source_idxs(self,
+                      pair_idx: int) -> tuple[int, int]:
+    """
+    Returns the (parameter, requirement) source indices of a pair.
+    """
+    return (self.param_srcs[self.param_rows[pair_idx]],
+            self.req_srcs[self.req_rows[pair_idx]])
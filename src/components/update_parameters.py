@@ -1,36 +1,112 @@
-import json
 import os
+import tempfile
 
-from istari_digital_client import Client
-from shared.helpers import submit_job, wait_for_job
+from istari_digital_client import ApiException, Client
+from shared.helpers import submit_job, wait_for_job, download_revision, format_transfer_stats, get_content_sha
 from shared.constants import CAD_TOOL_NAME
+from shared.metrics import timed
 
 
+@timed('update_parameters')
 def update_parameters(client: Client,
                       cad_mod_id: str,
-                      update_param_file_name: str):
+                      update_params: str | dict[str, object]) -> str:
+  """
+  Pushes new parameter values to the CAD model, creates a new model version
+  from the result and returns its revision id.
+
+  update_params is either the path of an update parameters JSON file or the
+  equivalent {'parameters': {name: value}} dict.
+  """
   print('Submitting job to update 3DX model parameters ...')
 
-  with open(update_param_file_name, 'r') as fin:
-    update_params = json.load(fin)
+  if isinstance(update_params, str):
+    job_params = {'params_file': update_params}
+  else:
+    job_params = {'params': update_params}
 
+  base_rev_id = client.get_model(cad_mod_id).file.revision.id
   job = submit_job(model_id = cad_mod_id,
                    function = '@istari:update_parameters',
                    tool_name = CAD_TOOL_NAME,
-                   params_file = update_param_file_name)
+                   client = client,
+                   **job_params)
   print(f"Job submitted with ID: {job.id}")
 
-  job = wait_for_job(job)
+  job = wait_for_job(job,
+                     client)
   print(f"Job Complete [{job.status.name}]")
 
   print('Updating CAD model version ...')
-  mod = client.get_model(cad_mod_id)
-  with open(mod.name, 'wb') as fout:
-    fout.write(mod.file.read_bytes())
-  client.update_model(cad_mod_id,
-                      mod.name)
-  os.remove(mod.name)
+  return bump_model_version(client,
+                            cad_mod_id,
+                            base_rev_id)
+
+
+@timed('version_bump')
+def bump_model_version(client: Client,
+                       mod_id: str,
+                       base_rev_id: str) -> str:
+  """
+  Makes sure the model has a version newer than base_rev_id and returns the
+  latest revision id.
+
+  If the model already moved past base_rev_id nothing is done. Otherwise the
+  latest revision is copied to a new version on the server, so the model
+  bytes never pass through this host. Registries that do not support the
+  copy fall back to reupload_model.
+  """
+  mod_file = client.get_model(mod_id).file
+  mod_rev = mod_file.revision
+  if mod_rev.id != base_rev_id:
+    print('Model already has a new version')
+    return mod_rev.id
+
+  try:
+    mod_file = client.copy_revision_to_existing_file(mod_rev.id,
+                                                     mod_file.id)
+    print('Created model version on the registry')
+    return mod_file.revision.id
+  except ApiException as e:
+    print(f"Server-side copy unavailable ({e.status}), uploading a local copy ...")
+    return reupload_model(client,
+                          mod_id,
+                          base_rev_id)
+
+
+def reupload_model(client: Client,
+                   mod_id: str,
+                   base_rev_id: str) -> str:
+  """
+  Creates a new model version by downloading the latest revision and
+  uploading it again.
+
+  The download is hashed from disk in chunks and must match the revision's
+  content token, so a damaged copy is never uploaded. The upload is skipped
+  when the model gained a new version with the same content while the copy
+  was downloading.
+  """
+  mod = client.get_model(mod_id)
+  mod_rev = mod.file.revision
+  content_token = mod_rev.content_token
+  with tempfile.TemporaryDirectory() as tmp_dir:
+    mod_file = os.path.join(tmp_dir, mod.name)
+    xfer_stats = download_revision(mod_rev,
+                                   mod_file,
+                                   client)
+    print(f"Downloaded model: {format_transfer_stats(xfer_stats)}")
+    if get_content_sha(mod_file, content_token.salt) != content_token.sha:
+      raise IOError(f"Downloaded copy of {mod.name} does not match revision {mod_rev.id}")
+
+    latest_rev = client.get_model(mod_id).file.revision
+    if latest_rev.id != base_rev_id:
+      latest_token = latest_rev.content_token
+      if get_content_sha(mod_file, latest_token.salt) == latest_token.sha:
+        print('Model already has a new version with the same content, skipping upload')
+        return latest_rev.id
 
+    return client.update_model(mod_id,
+                               mod_file).file.revision.id
 
 if __name__ == '__main__':
   client = get_client()
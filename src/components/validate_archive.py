@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from time import perf_counter
+
+from components.validate_requirements import find_param_reqs, get_checks
+from shared.helpers import format_str
+from shared.constants import REQ_FILE_NAME, PARAM_FILE_NAME, GREEN_COLOR, RED_COLOR, BOLD_FORMAT
+
+
+# Tasks handed out per worker, so a slow pair does not leave the other
+# workers idle at the end of the run
+TASKS_PER_WORKER = 4
+
+
+def find_file_pairs(archive_dir: str) -> list[dict[str, str]]:
+  """
+  Returns one {'name', 'requirements', 'parameters'} entry per parameters file
+  under archive_dir, paired with the requirements file in the same directory
+  or the nearest parent directory (up to archive_dir).
+  """
+  archive_dir = os.path.abspath(archive_dir)
+  file_pairs = []
+  for dir_path, dir_names, file_names in os.walk(archive_dir):
+    dir_names.sort()
+    if not PARAM_FILE_NAME in file_names:
+      continue
+
+    req_dir = dir_path
+    while not os.path.isfile(os.path.join(req_dir, REQ_FILE_NAME)) and req_dir != archive_dir:
+      req_dir = os.path.dirname(req_dir)
+    req_file = os.path.join(req_dir, REQ_FILE_NAME)
+    file_pairs.append({'name': os.path.relpath(dir_path, archive_dir),
+                       'requirements': req_file if os.path.isfile(req_file) else None,
+                       'parameters': os.path.join(dir_path, PARAM_FILE_NAME)})
+
+  return file_pairs
+
+
+def load_manifest(manifest_file: str) -> list[dict[str, str]]:
+  """
+  Reads a JSON list of {'requirements', 'parameters'[, 'name']} entries.
+  Relative paths are relative to the manifest's directory.
+  """
+  manifest_dir = os.path.dirname(os.path.abspath(manifest_file))
+  with open(manifest_file, 'r') as fin:
+    entries = json.load(fin)
+
+  file_pairs = []
+  for entry in entries:
+    req_file = os.path.join(manifest_dir, entry['requirements'])
+    param_file = os.path.join(manifest_dir, entry['parameters'])
+    file_pairs.append({'name': entry.get('name', os.path.relpath(param_file, manifest_dir)),
+                       'requirements': req_file,
+                       'parameters': param_file})
+
+  return file_pairs
+
+
+def get_tasks(file_pairs: list[dict[str, str]],
+              worker_count: int) -> list[list[dict[str, str]]]:
+  """
+  Splits the file pairs into tasks that each use a single requirements file,
+  so a worker parses and indexes it once per task (and not again for the
+  next task on the same file, see get_requirement_index).
+  """
+  req_grps = {}
+  for file_pair in file_pairs:
+    req_grps.setdefault(file_pair['requirements'], []).append(file_pair)
+
+  task_size = max(1, len(file_pairs) // (worker_count * TASKS_PER_WORKER))
+  tasks = []
+  for req_grp in req_grps.values():
+    for task_start in range(0, len(req_grp), task_size):
+      tasks.append(req_grp[task_start:task_start + task_size])
+
+  return tasks
+
+
+def validate_file_pairs(file_pairs: list[dict[str, str]]) -> list[dict[str, object]]:
+  """
+  Matches and checks each file pair. Errors are recorded in the result
+  rather than raised so one bad snapshot does not stop the run.
+  """
+  results = []
+  for file_pair in file_pairs:
+    start_time = perf_counter()
+    result = dict(file_pair,
+                  pairs=0,
+                  failing=0,
+                  failures=[],
+                  error=None)
+    try:
+      if file_pair['requirements'] is None:
+        raise FileNotFoundError(f"No {REQ_FILE_NAME} found for {file_pair['parameters']}")
+      param_reqs = find_param_reqs(file_pair['requirements'],
+                                   file_pair['parameters'],
+                                   compact=True)
+      # Source indices locate each failing entry in the snapshot files
+      failures = []
+      for pair_idx, passed in enumerate(get_checks(param_reqs)):
+        if not passed:
+          param_obj, req_obj = param_reqs[pair_idx]
+          param_src, req_src = param_reqs.get_source_idxs(pair_idx)
+          failures.append({'requirement': req_obj['qualified_name'],
+                           'requirement_index': req_src,
+                           'parameter': param_obj['name'],
+                           'parameter_index': param_src,
+                           'bounds': req_obj['bounds'],
+                           'value': param_obj['value']})
+      result['pairs'] = len(param_reqs)
+      result['failing'] = len(failures)
+      result['failures'] = failures
+    except Exception as e:
+      result['error'] = f"{type(e).__name__}: {e}"
+
+    result['seconds'] = perf_counter() - start_time
+    results.append(result)
+
+  return results
+
+
+def validate_archive(file_pairs: list[dict[str, str]],
+                     output_file: str,
+                     max_workers: int = None) -> dict[str, object]:
+  """
+  Validates every file pair across a pool of max_workers processes (one per
+  core by default) and writes the consolidated results to output_file.
+  Returns the report that was written.
+  """
+  worker_count = max(1, min(max_workers or os.cpu_count() or 1, len(file_pairs)))
+  start_time = perf_counter()
+  results = []
+  tasks = get_tasks([dict(file_pair, index=pair_idx) for pair_idx, file_pair in enumerate(file_pairs)],
+                    worker_count)
+  if worker_count == 1:
+    for task in tasks:
+      results.extend(validate_file_pairs(task))
+  else:
+    with ProcessPoolExecutor(max_workers=worker_count) as pool:
+      futures = [pool.submit(validate_file_pairs, task) for task in tasks]
+      for future in as_completed(futures):
+        results.extend(future.result())
+  wall_time = perf_counter() - start_time
+
+  results.sort(key=lambda result: result.pop('index'))
+  report = {'created': datetime.now(timezone.utc).isoformat(),
+            'workers': worker_count,
+            'seconds': wall_time,
+            'totals': {'files': len(results),
+                       'passing': sum(1 for result in results if result['error'] is None and result['failing'] == 0),
+                       'failing': sum(1 for result in results if result['failing'] > 0),
+                       'errors': sum(1 for result in results if result['error'] is not None),
+                       'pairs': sum(result['pairs'] for result in results),
+                       'failing_pairs': sum(result['failing'] for result in results)},
+            'results': results}
+
+  out_dir = os.path.dirname(output_file)
+  if out_dir:
+    os.makedirs(out_dir, exist_ok=True)
+  tmp_file = f"{output_file}.{os.getpid()}.tmp"
+  with open(tmp_file, 'w') as fout:
+    json.dump(report, fout, indent=2)
+  os.replace(tmp_file, output_file)
+
+  return report
+
+
+def print_archive_report(report: dict[str, object]):
+  for result in report['results']:
+    if result['error'] is not None:
+      print(f"{format_str('ERROR', RED_COLOR)} {result['name']}: {result['error']}")
+    elif result['failing'] > 0:
+      print(f"{format_str('FAIL', RED_COLOR)} {result['name']}: "
+            f"{result['failing']} of {result['pairs']} pair(s) failing")
+
+  totals = report['totals']
+  msg = (f"{totals['files']} file pair(s): {totals['passing']} passing, "
+         f"{totals['failing']} failing, {totals['errors']} error(s)")
+  color = GREEN_COLOR if totals['failing'] == 0 and totals['errors'] == 0 else RED_COLOR
+  print(format_str(msg, color, BOLD_FORMAT))
+  print(f"Validated {totals['pairs']} matched pairs in {report['seconds']:.1f} s "
+        f"with {report['workers']} worker(s)")
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(prog='Validate Archive',
+                                   description='Re-validates archived requirements/parameters snapshots in parallel. '
+                                               'Exits with status 1 if any snapshot fails or cannot be read.')
+  source_group = parser.add_mutually_exclusive_group(required=True)
+  source_group.add_argument('--dir',
+                            help=f"Directory searched for {PARAM_FILE_NAME} files, each paired with the "
+                                 f"{REQ_FILE_NAME} in its directory or the nearest parent")
+  source_group.add_argument('--manifest',
+                            help='JSON list of {"requirements": file, "parameters": file, "name": label} entries')
+  parser.add_argument('--output',
+                      default='validation_results.json',
+                      help='Consolidated results JSON file')
+  parser.add_argument('--workers',
+                      type=int,
+                      help='Number of worker processes (default: one per core)')
+  args = parser.parse_args()
+
+  file_pairs = find_file_pairs(args.dir) if args.dir else load_manifest(args.manifest)
+  if len(file_pairs) == 0:
+    print('No file pairs found')
+    sys.exit(0)
+
+  report = validate_archive(file_pairs,
+                            args.output,
+                            args.workers)
+  print_archive_report(report)
+  print(f"Results written to {args.output}")
+  totals = report['totals']
+  sys.exit(1 if totals['failing'] > 0 or totals['errors'] > 0 else 0)
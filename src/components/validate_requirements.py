@@ -1,8 +1,34 @@
+import argparse
+import csv
+import io
 import json
+import math
+import os
 import re
-from prettytable import PrettyTable
+import sys
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import islice
 from enum import Enum, auto
+from components.param_req_pairs import ParamReqPairs
 from shared.helpers import format_str
+from shared.json_stream import JsonReader, iter_json_array, filter_fields
+from shared.metrics import timed
+from shared.constants import PARSE_CACHE_SIZE, BATCH_VALIDATION_THRESHOLD, REPORT_TABLE_MAX_ROWS, GREEN_COLOR, RED_COLOR, BOLD_FORMAT, REQ_FILE_NAME, PARAM_FILE_NAME
+
+
+PARAM_PATTERN = re.compile(r"^([\d.eE\-\+]+)(.*)")
+RANGE_BND_PATTERN = re.compile(r"^([^;]+)\s*;\s*([^\]]+)$")
+LESS_BND_PATTERN = re.compile(r"^<(=?)\s*(.*)$")
+GREATER_BND_PATTERN = re.compile(r"^>(=?)\s*(.*)$")
+EQUAL_BND_PATTERN = re.compile(r"^=\s*(.*)$")
+
+# The only fields validation reads; streamed loading drops everything else
+REQ_FIELDS = ('qualified_name', 'bounds')
+PARAM_FIELDS = ('name', 'value', 'units')
+
+REPORT_MODES = ('table', 'lines', 'jsonl', 'csv')
+REPORT_COLUMNS = ('requirement', 'parameter', 'bounds', 'value', 'passed')
 
 
 class BoundType(Enum):
@@ -15,6 +41,7 @@ class BoundType(Enum):
 
 
 class Parameter():
+  __slots__ = ('value', 'units')
 
   def __init__(self, param_str: str):
     self.value, self.units = self.parse_param_str(param_str)
@@ -23,26 +50,13 @@ class Parameter():
     return f"{self.value}{self.units}"
 
   def parse_param_str(self,
-                      param_str: str) -> tuple[str, str]:
-    m = re.match('^([\d.eE\-\+]+)(.*)',
-                 param_str)
-    if m is None:
-      param_val = 0
-      param_units = ''
-    else:
-      grps = m.groups(1)
-      try:
-        param_val = float(grps[0])
-      except ValueError:
-        param_val = 0.0
-      param_units = grps[1] if len(grps) > 1 else ''
-
-    return tuple([param_val,
-                  param_units])
+                      param_str: str) -> tuple[float, str]:
+    return parse_param_str(param_str)
 
 
 class Bounds():
-  
+  __slots__ = ('lower', 'upper', 'type')
+
   def __init__(self, bnd_str: str):
     self.lower = None
     self.upper = None
@@ -79,49 +93,28 @@ class Bounds():
 
     return ret_val
 
+  def get_interval(self) -> tuple[float, bool, float, bool]:
+    """
+    Returns the bounds as (lower, lower closed, upper, upper closed), with
+    infinite ends for one-sided bounds.
+    """
+    match self.get_type():
+      case BoundType.RANGE | BoundType.EQUAL_TO:
+        return self.get_lower(), True, self.get_upper(), True
+      case BoundType.LESS_THAN:
+        return -math.inf, False, self.get_upper(), False
+      case BoundType.LESS_THAN_EQUAL:
+        return -math.inf, False, self.get_upper(), True
+      case BoundType.GREATER_THAN:
+        return self.get_lower(), False, math.inf, False
+      case BoundType.GREATER_THAN_EQUAL:
+        return self.get_lower(), True, math.inf, False
+      case _:
+        raise TypeError(f"Unrecognized bound type: {self.get_type()}")
+
   def parse_bnd_str(self,
                     bnd_str: str):
-    bnd_str = bnd_str.strip(' []')
-    m = re.search(r"^([^;]+)\s*;\s*([^\]]+)$",
-                  bnd_str)
-    if not m is None:
-      self.type = BoundType.RANGE
-      self.lower = float(m.groups(1)[0])
-      self.upper = float(m.groups(1)[1])
-      return
-
-    m = re.search(r"^<(=?)\s*(.*)$",
-                  bnd_str)
-    if not m is None:
-      if m.groups(1)[0] is None:
-        self.type = BoundType.LESS_THAN
-      else:
-        self.type = BoundType.LESS_THAN_EQUAL
-      self.lower = None
-      self.upper = float(m.groups(1)[1])
-      return
-
-    m = re.search(r"^>(=?)\s*(.*)$",
-                  bnd_str)
-    if not m is None:
-      if m.groups(1)[0] is None:
-        self.type = BoundType.GREATER_THAN
-      else:
-        self.type = BoundType.GREATER_THAN_EQUAL
-      self.lower = None
-      self.upper = float(m.groups(1)[1])
-      return
-
-    m = re.search(r"^=\s*(.*)$",
-                  bnd_str)
-    if not m is None:
-      val = float(m.groups(1)[0])
-      self.lower = val
-      self.upper = val
-      self.type = BoundType.EQUAL_TO
-      return
-
-    raise TypeError(f"Error parsing bounds: {bnd_str}")
+    self.type, self.lower, self.upper = parse_bnd_str(bnd_str)
 
   def get_nearest_passing_value(self,
                                 val: float) -> float:
@@ -132,11 +125,11 @@ class Bounds():
         case BoundType.EQUAL_TO:
           ret_val = self.get_lower()
         case BoundType.LESS_THAN:
-          ret_val = self.get_upper() - 2.0 * sys.float_info.epsilon
+          ret_val = math.nextafter(self.get_upper(), -math.inf)
         case BoundType.LESS_THAN_EQUAL:
           ret_val = self.get_upper()
         case BoundType.GREATER_THAN:
-          ret_val = self.get_lower() + 2.0 * sys.float_info.epsilon
+          ret_val = math.nextafter(self.get_lower(), math.inf)
         case BoundType.GREATER_THAN_EQUAL:
           ret_val = self.get_lower()
         case BoundType.RANGE:
@@ -145,36 +138,290 @@ class Bounds():
     return ret_val
 
 
-def get_column_header_color() -> int:
-  return 34
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_param_str(param_str: str) -> tuple[float, str]:
+  """
+  Splits a parameter string such as '12.5mm' into its value and units.
+
+  Results are memoized, so each distinct value string is parsed once per run.
+  """
+  m = PARAM_PATTERN.match(param_str)
+  if m is None:
+    param_val = 0.0
+    param_units = ''
+  else:
+    grps = m.groups(1)
+    try:
+      param_val = float(grps[0])
+    except ValueError:
+      param_val = 0.0
+    param_units = grps[1] if len(grps) > 1 else ''
+
+  return tuple([param_val,
+                param_units])
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_bnd_str(bnd_str: str) -> tuple[BoundType, float, float]:
+  """
+  Parses a requirement bounds string into (type, lower, upper).
+
+  Results are memoized, so each distinct bounds string is parsed once per run.
+  Throws TypeError if the string is not a recognized bound.
+  """
+  bnd_str = bnd_str.strip(' []')
+  m = RANGE_BND_PATTERN.search(bnd_str)
+  if not m is None:
+    return tuple([BoundType.RANGE,
+                  float(m.group(1)),
+                  float(m.group(2))])
+
+  m = LESS_BND_PATTERN.search(bnd_str)
+  if not m is None:
+    bnd_type = BoundType.LESS_THAN_EQUAL if m.group(1) else BoundType.LESS_THAN
+    return tuple([bnd_type,
+                  None,
+                  float(m.group(2))])
+
+  m = GREATER_BND_PATTERN.search(bnd_str)
+  if not m is None:
+    bnd_type = BoundType.GREATER_THAN_EQUAL if m.group(1) else BoundType.GREATER_THAN
+    return tuple([bnd_type,
+                  float(m.group(2)),
+                  None])
+
+  m = EQUAL_BND_PATTERN.search(bnd_str)
+  if not m is None:
+    val = float(m.group(1))
+    return tuple([BoundType.EQUAL_TO,
+                  val,
+                  val])
+
+  raise TypeError(f"Error parsing bounds: {bnd_str}")
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def get_bounds(bnd_str: str) -> Bounds:
+  """
+  Returns the compiled Bounds for bnd_str, shared between every pass over the
+  same requirement. The returned object must be treated as read-only.
+  """
+  return Bounds(bnd_str)
+
+
+def get_parse_cache_stats() -> dict[str, dict[str, int]]:
+  """
+  Returns hit/miss counts for the bounds and parameter parse caches. The
+  scalar checks look up every pair's strings, and BatchValidator looks up
+  each distinct string once per pass, so hits count strings reused from an
+  earlier pass or pair.
+  """
+  stats = {}
+  for cache_name, cache_func in [('bounds', get_bounds),
+                                 ('parameters', parse_param_str)]:
+    info = cache_func.cache_info()
+    stats[cache_name] = {'hits': info.hits,
+                         'misses': info.misses,
+                         'size': info.currsize}
+
+  return stats
 
 
-def find_param_reqs(req_file: str,
-                    param_file: str) -> list[tuple[dict[str, object], dict[str, object]]]:
-  prs = []
-
-  with open(req_file, 'r', encoding='Windows-1252') as fin:
-    reqs_obj = json.load(fin)
+def get_column_header_color() -> int:
+  return 34
 
-  with open(param_file, 'r') as fin:
-    params_obj = json.load(fin)
 
+class RequirementIndex():
+  """
+  Suffix index over requirement qualified names.
+
+  Names are stored reversed and sorted, so every requirement whose qualified
+  name ends with a given suffix sits in one contiguous slice that can be
+  located with a binary search.
+  """
+
+  def __init__(self, reqs_obj: list[dict[str, object]]):
+    self.reqs = reqs_obj
+    rev_names = sorted((req_obj['qualified_name'].strip()[::-1], req_idx)
+                       for req_idx, req_obj in enumerate(reqs_obj))
+    self.keys = [rev_name for rev_name, _ in rev_names]
+    self.idxs = [req_idx for _, req_idx in rev_names]
+    self.matches = {}
+
+  def find(self,
+           suffix: str) -> list[dict[str, object]]:
+    """
+    Returns the requirements whose qualified name ends with suffix, in the
+    order they appear in the requirements file.
+    """
+    return [self.reqs[req_idx] for req_idx in self.find_idxs(suffix)]
+
+  def find_idxs(self,
+                suffix: str) -> list[int]:
+    """
+    Returns the positions in the requirements file of the requirements find
+    would return.
+    """
+    match_idxs = self.matches.get(suffix)
+    if match_idxs is None:
+      rev_suffix = suffix[::-1]
+      lo = bisect_left(self.keys, rev_suffix)
+      hi = bisect_left(self.keys, rev_suffix + chr(0x10FFFF), lo)
+      match_idxs = self.matches[suffix] = sorted(self.idxs[lo:hi])
+
+    return match_idxs
+
+
+req_index_cache = {}
+
+def get_requirement_index(req_file: str) -> RequirementIndex:
+  """
+  Returns the suffix index for req_file, building it only when the file is
+  new or has changed on disk since the last call.
+  """
+  req_stat = os.stat(req_file)
+  cache_key = (os.path.abspath(req_file),
+               req_stat.st_mtime_ns,
+               req_stat.st_size)
+  req_idx = req_index_cache.get(cache_key)
+  if req_idx is None:
+    with open(req_file, 'r', encoding='Windows-1252') as fin:
+      reqs_obj = load_requirements(fin)
+    req_index_cache.clear()
+    req_idx = req_index_cache[cache_key] = RequirementIndex(reqs_obj)
+
+  return req_idx
+
+
+def load_requirements(fin,
+                      streaming: bool = True) -> list[dict[str, object]]:
+  """
+  Reads a requirements array from text stream fin. When streaming, the
+  array is decoded one requirement at a time and only REQ_FIELDS are kept,
+  so memory use does not grow with the unused parts of the export.
+  """
+  if not streaming:
+    return json.load(fin)
+  return [filter_fields(req_obj, REQ_FIELDS) for req_obj in iter_json_array(fin)]
+
+
+def load_parameters(fin,
+                    streaming: bool = True) -> list[dict[str, object]]:
+  """
+  Reads a parameters array from text stream fin. When streaming, the
+  'parameters' array of each part is decoded one parameter at a time and
+  only its PARAM_FIELDS are kept, so a part with many parameters is never
+  held whole. The part's other fields are decoded one at a time and dropped.
+  """
+  if not streaming:
+    return json.load(fin)
+
+  reader = JsonReader(fin)
+  params_obj = []
+  for _ in reader.iter_array():
+    params = None
+    for key in reader.iter_object():
+      if key == 'parameters' and reader.peek() == '[':
+        params = [filter_fields(param, PARAM_FIELDS) for param in reader.iter_values()]
+      elif key == 'parameters':
+        params = reader.read_value()
+      else:
+        reader.read_value()
+    params_obj.append({'parameters': params})
+  reader.finish()
+  return params_obj
+
+
+# parse_requirements and parse_parameters stream from artifact contents that
+# are already in memory: streaming keeps the decoded objects small, but peak
+# memory still includes the raw bytes of the artifact
+@timed('parse')
+def parse_requirements(req_data: bytes,
+                       streaming: bool = True) -> list[dict[str, object]]:
+  if not streaming:
+    return json.loads(req_data.decode('Windows-1252'))
+  return load_requirements(io.TextIOWrapper(io.BytesIO(req_data), encoding='Windows-1252'))
+
+
+@timed('parse')
+def parse_parameters(param_data: bytes,
+                     streaming: bool = True) -> list[dict[str, object]]:
+  if not streaming:
+    return json.loads(param_data)
+  return load_parameters(io.TextIOWrapper(io.BytesIO(param_data), encoding='utf-8'))
+
+
+@timed('match')
+def match_param_reqs(reqs: list[dict[str, object]] | RequirementIndex,
+                     params_obj: list[dict[str, object]],
+                     compact: bool = False) -> list[tuple[dict[str, object], dict[str, object]]] | ParamReqPairs:
+  """
+  Pairs every parameter with the requirements whose qualified name ends with
+  the parameter name. reqs is the parsed requirements list, or a
+  RequirementIndex built from it when it is matched more than once.
+
+  With compact=True the pairs are returned as a ParamReqPairs, which holds
+  none of the parsed dicts and can be used in place of the list.
+  """
+  req_idx = reqs if isinstance(reqs, RequirementIndex) else RequirementIndex(reqs)
+
+  prs = ParamReqPairs() if compact else []
+  param_src = 0
   for param_obj in params_obj:
     params = param_obj['parameters']
     if not params is None:
       for param in params:
         param_name = param['name'].split('\\')[-1].strip()
-        param_srch_str = f"{param_name}"
-
-        for req_obj in reqs_obj:
-          req_name = req_obj['qualified_name'].strip()
-          if not req_name is None and req_name.endswith(param_srch_str):
+        if compact:
+          match_idxs = req_idx.find_idxs(param_name)
+          if len(match_idxs) > 0:
+            param_row = prs.add_param(param_src,
+                                      param)
+            for match_idx in match_idxs:
+              prs.add_pair(param_row,
+                           match_idx,
+                           req_idx.reqs[match_idx])
+        else:
+          for req_obj in req_idx.find(param_name):
             prs.append((param, req_obj))
+        param_src += 1
 
-  return prs
+  return prs.finish() if compact else prs
 
 
-def get_failing_params(param_reqs: list[tuple[dict[str, object], dict[str, object]]]) -> list[tuple[dict[str, object], dict[str, object]]]:
+@timed('find_param_reqs')
+def find_param_reqs(req_file: str,
+                    param_file: str,
+                    compact: bool = False) -> list[tuple[dict[str, object], dict[str, object]]] | ParamReqPairs:
+  req_idx = get_requirement_index(req_file)
+
+  with open(param_file, 'r') as fin:
+    params_obj = load_parameters(fin)
+
+  return match_param_reqs(req_idx,
+                          params_obj,
+                          compact)
+
+
+def use_batch_validation(param_reqs: list[tuple[dict[str, object], dict[str, object]]],
+                         batch: bool = None) -> bool:
+  if batch is None:
+    batch = len(param_reqs) >= BATCH_VALIDATION_THRESHOLD
+  return batch
+
+
+@timed('validate')
+def get_failing_params(param_reqs: list[tuple[dict[str, object], dict[str, object]]],
+                       batch: bool = None) -> list[tuple[dict[str, object], dict[str, object]]]:
+  """
+  Returns the pairs whose parameter value does not satisfy the requirement
+  bounds. Large sets (or batch=True) are judged by the vectorized
+  BatchValidator instead of one check_requirement call per pair.
+  """
+  if use_batch_validation(param_reqs, batch):
+    from components.batch_validation import BatchValidator
+    return BatchValidator(param_reqs).get_failing_params()
+
   fail_param_reqs = []
   for param_req in param_reqs:
     param_obj, req_obj = param_req
@@ -183,58 +430,178 @@ def get_failing_params(param_reqs: list[tuple[dict[str, object], dict[str, objec
 
   return fail_param_reqs
 
-  
-def check_requirement(param_obj: dict[str, object],
-                      req_obj: dict[str, object]) -> bool:
-  param_str = param_obj['value']
-  bnd = Bounds(req_obj['bounds'])
-  param = Parameter(param_str)
 
-  return bnd.is_satisfied(param.value)
+@timed('validate')
+def get_checks(param_reqs: list[tuple[dict[str, object], dict[str, object]]],
+               batch: bool = None) -> list[bool]:
+  """
+  Returns whether each pair satisfies its requirement, in pair order.
+  """
+  if use_batch_validation(param_reqs, batch):
+    from components.batch_validation import BatchValidator
+    return BatchValidator(param_reqs).is_satisfied().tolist()
 
+  return [check_requirement(param_obj, req_obj) for param_obj, req_obj in param_reqs]
 
-def print_summary(param_reqs: list[tuple[dict[str, object], dict[str, object]]]):
-  print('Validating CAD parameters against requirements ...')
   
-  tab = PrettyTable()
-  header_color = get_column_header_color();
-  req_col_header = format_str('Requirement',
-                              header_color, 1)
-  param_col_header = format_str('CAD Parameter',
-                                header_color, 1)
-  bounds_col_header = format_str('Bounds',
-                                 header_color, 1)
-  param_val_col_header = format_str('Parameter Value',
-                                    header_color, 1)
-  tab.field_names = [req_col_header,
-                     param_col_header, 
-                     bounds_col_header,
-                     param_val_col_header]
-  # Search for relevant requirements for 3DX parameters
-  for param_req in param_reqs:
-    param, req = param_req
-    param_name = param['name']
-    param_val = param['value']
-    req_bnds = req['bounds']
-    
-    req_qual_name = req['qualified_name']
-    if check_requirement(param, req):
-      req_str = format_str(req_qual_name, 32)
-    else:
-      req_str = format_str(req_qual_name, 31)
-
-    tab.add_row([req_str,
-                 param_name,
-                 req_bnds,
-                 param_val])
-
-  tab.align = 'l'
-  print(tab)
+def check_requirement(param_obj: dict[str, object],
+                      req_obj: dict[str, object]) -> bool:
+  bnd = get_bounds(req_obj['bounds'])
+  param_val, _ = parse_param_str(param_obj['value'])
+
+  return bnd.is_satisfied(param_val)
+
+
+@timed('report')
+def print_summary(param_reqs: list[tuple[dict[str, object], dict[str, object]]],
+                  checks: list[bool] = None,
+                  mode: str = None,
+                  failures_only: bool = False,
+                  limit: int = None,
+                  offset: int = 0,
+                  rank: bool = False,
+                  report_file: str = None):
+  """
+  Reports every matched pair, or only the failing ones, in one of
+  REPORT_MODES. 'table' renders one colored table; 'lines', 'jsonl' and
+  'csv' write each row as soon as it is produced. When mode is not given,
+  runs with more than REPORT_TABLE_MAX_ROWS pairs report failing pairs as
+  lines instead of a table. checks are the pass/fail results in pair order
+  and are computed if not given. With rank, failing pairs furthest from
+  their nearest passing value come first. The first offset rows are skipped
+  and at most limit rows are reported after them, so a large report can be
+  read a page at a time. Machine-readable modes can be written to
+  report_file instead of stdout.
+  """
+  if mode is None:
+    mode = 'table'
+    if len(param_reqs) > REPORT_TABLE_MAX_ROWS and not failures_only:
+      print(f"{len(param_reqs)} matched pairs, reporting failing pairs only")
+      mode = 'lines'
+      failures_only = True
+  if checks is None:
+    checks = get_checks(param_reqs)
+
+  rows = iter_report_rows(param_reqs,
+                          checks,
+                          failures_only,
+                          limit,
+                          offset,
+                          rank)
+  if mode in ('jsonl', 'csv') and report_file is not None:
+    with open(report_file, 'w', newline='') as fout:
+      row_count = write_report(rows, mode, fout)
+    print(f"Wrote {row_count} row(s) to {report_file}")
+  else:
+    if mode in ('table', 'lines'):
+      print('Validating CAD parameters against requirements ...')
+    row_count = write_report(rows, mode, sys.stdout)
+
+  if mode in ('table', 'lines'):
+    shown_count = len(param_reqs) if not failures_only else len(checks) - sum(checks)
+    if offset > 0:
+      print(f"... {min(offset, shown_count)} earlier row(s) skipped")
+    if offset + row_count < shown_count:
+      print(f"... {shown_count - offset - row_count} more row(s) not shown")
 
   # TODO: How to deal with units?
 
 
-def fix_failing_params(param_reqs: list[tuple[dict[str, object], dict[str, object]]]) -> list[dict[str, str]]:
+def print_verdict(fail_count: int,
+                  mode: str = None,
+                  report_file: str = None):
+  """
+  Prints the pass/fail summary line, on stderr when a jsonl or csv report
+  goes to stdout so the report stream holds only rows.
+  """
+  fout = sys.stderr if mode in ('jsonl', 'csv') and report_file is None else sys.stdout
+  if fail_count == 0:
+    msg = 'CAD Parameters satisfy all associated requirements'
+    print(format_str(msg, GREEN_COLOR, BOLD_FORMAT), file=fout)
+  else:
+    msg = f"{fail_count} failed requirement(s) found"
+    print(format_str(msg, RED_COLOR, BOLD_FORMAT), file=fout)
+
+
+def get_failure_distance(param_obj: dict[str, object],
+                         req_obj: dict[str, object]) -> float:
+  """
+  Returns how far the parameter value is from the nearest value that
+  satisfies the requirement, 0 if it already does.
+  """
+  param_val, _ = parse_param_str(param_obj['value'])
+  return abs(get_bounds(req_obj['bounds']).get_nearest_passing_value(param_val) - param_val)
+
+
+def iter_report_rows(param_reqs: list[tuple[dict[str, object], dict[str, object]]],
+                     checks: list[bool],
+                     failures_only: bool,
+                     limit: int,
+                     offset: int = 0,
+                     rank: bool = False):
+  rows = ((param, req, passed) for (param, req), passed in zip(param_reqs, checks)
+          if not (failures_only and passed))
+  if rank:
+    # Stable, so pairs equally far off keep their input order
+    rows = sorted(rows,
+                  key=lambda row: 0.0 if row[2] else get_failure_distance(row[0], row[1]),
+                  reverse=True)
+  for param, req, passed in islice(rows, offset, None if limit is None else offset + limit):
+    yield (req['qualified_name'],
+           param['name'],
+           req['bounds'],
+           param['value'],
+           bool(passed))
+
+
+def write_report(rows,
+                 mode: str,
+                 fout) -> int:
+  """
+  Writes report rows in the given mode and returns how many were written.
+  """
+  row_count = 0
+  if mode == 'table':
+    from prettytable import PrettyTable
+    tab = PrettyTable()
+    header_color = get_column_header_color();
+    tab.field_names = [format_str(col_header, header_color, 1)
+                       for col_header in ('Requirement', 'CAD Parameter', 'Bounds', 'Parameter Value')]
+    for req_qual_name, param_name, req_bnds, param_val, passed in rows:
+      req_str = format_str(req_qual_name, GREEN_COLOR if passed else RED_COLOR)
+      tab.add_row([req_str,
+                   param_name,
+                   req_bnds,
+                   param_val])
+      row_count += 1
+    tab.align = 'l'
+    print(tab, file=fout)
+  elif mode == 'lines':
+    for req_qual_name, param_name, req_bnds, param_val, passed in rows:
+      status = format_str('PASS', GREEN_COLOR) if passed else format_str('FAIL', RED_COLOR)
+      fout.write(f"{status} {req_qual_name} | {param_name} | {req_bnds} | {param_val}\n")
+      row_count += 1
+  elif mode == 'jsonl':
+    for row in rows:
+      fout.write(json.dumps(dict(zip(REPORT_COLUMNS, row))))
+      fout.write('\n')
+      row_count += 1
+  elif mode == 'csv':
+    writer = csv.writer(fout)
+    writer.writerow(REPORT_COLUMNS)
+    for row in rows:
+      writer.writerow(row)
+      row_count += 1
+  else:
+    raise ValueError(f"Unknown report mode: {mode}")
+
+  return row_count
+
+
+@timed('fix')
+def fix_failing_params(param_reqs: list[tuple[dict[str, object], dict[str, object]]],
+                       batch: bool = None) -> list[dict[str, str]]:
+  from prettytable import PrettyTable
   pt = PrettyTable()
   header_color = get_column_header_color()
   param_col_header = format_str('CAD Parameter',
@@ -243,24 +610,87 @@ def fix_failing_params(param_reqs: list[tuple[dict[str, object], dict[str, objec
                               header_color, 1)
   pt.field_names = [param_col_header,
                     val_col_header]
+  if use_batch_validation(param_reqs, batch):
+    from components.batch_validation import BatchValidator
+    new_val_strs = BatchValidator(param_reqs).get_value_strs()
+  else:
+    new_val_strs = []
+    for param_obj, req_obj in param_reqs:
+      bnd = get_bounds(req_obj['bounds'])
+      param = Parameter(param_obj['value'])
+      param.value = bnd.get_nearest_passing_value(param.value)
+      new_val_strs.append(param.get_value_str())
+
   new_params = []
-  for param_req in param_reqs:
+  for param_req, new_val_str in zip(param_reqs, new_val_strs):
     param_obj, req_obj = param_req
-    bnd = Bounds(req_obj['bounds'])
-    param = Parameter(param_obj['value'])
-    param.value = bnd.get_nearest_passing_value(param.value)
     new_param = {}
     new_param['name'] = param_obj['name']
-    new_param['value'] = param.get_value_str()
+    new_param['value'] = new_val_str
     new_param['units'] = param_obj['units']
     new_params.append(new_param)
     pt.add_row([param_obj['name'],
-                param.get_value_str()])
+                new_val_str])
 
   print(pt)
   return new_params
 
 
+def validate_requirements(req_file: str = REQ_FILE_NAME,
+                          param_file: str = PARAM_FILE_NAME,
+                          **report_opts) -> int:
+  """
+  Validates local requirements and parameters files without the registry
+  client, reports the matched pairs and returns the number of failing pairs.
+  """
+  param_reqs = find_param_reqs(req_file,
+                               param_file,
+                               compact=True)
+  checks = get_checks(param_reqs)
+  print_summary(param_reqs,
+                checks,
+                **report_opts)
+
+  fail_count = len(checks) - sum(checks)
+  print_verdict(fail_count,
+                report_opts.get('mode'),
+                report_opts.get('report_file'))
+  return fail_count
+
+
 if __name__ == '__main__':
-  validate_requirements()
+  parser = argparse.ArgumentParser(prog='Validate Requirements',
+                                   description='Validates local requirements and parameters JSON files. '
+                                               'Exits with status 1 if any requirement fails.')
+  parser.add_argument('--requirements',
+                      default=REQ_FILE_NAME,
+                      help='Requirements JSON file')
+  parser.add_argument('--parameters',
+                      default=PARAM_FILE_NAME,
+                      help='Parameters JSON file')
+  parser.add_argument('--report',
+                      choices=REPORT_MODES)
+  parser.add_argument('--failures_only',
+                      action='store_true')
+  parser.add_argument('--limit',
+                      type=int,
+                      metavar='N')
+  parser.add_argument('--offset',
+                      type=int,
+                      default=0,
+                      metavar='N')
+  parser.add_argument('--rank',
+                      action='store_true')
+  parser.add_argument('--report_file')
+  args = parser.parse_args()
+
+  fail_count = validate_requirements(args.requirements,
+                                     args.parameters,
+                                     mode=args.report,
+                                     failures_only=args.failures_only,
+                                     limit=args.limit,
+                                     offset=args.offset,
+                                     rank=args.rank,
+                                     report_file=args.report_file)
+  sys.exit(1 if fail_count > 0 else 0)
 
@@ -1,15 +1,25 @@
 import argparse
-import json
 import re
 import sys
+import tempfile
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import perf_counter
 from istari_digital_client import Client
+from prettytable import PrettyTable
 from components.extract_requirements import extract_requirements
 from components.extract_parameters import extract_parameters
 from components.extract_cad_data import extract_cad_data
 from components.update_parameters import update_parameters
-from components.validate_requirements import print_summary, find_param_reqs, check_requirement, get_failing_params, fix_failing_params
-from shared.helpers import get_client, format_str, get_input, wait_for_new_version, download_artifact, get_latest_revision, wait_for_all_jobs
+from components.bounds_solver import solve_failing_params
+from components.incremental_validation import IncrementalValidator, format_delta
+from components.validate_requirements import RequirementIndex, get_column_header_color, print_summary, print_verdict, match_param_reqs, parse_requirements, parse_parameters, check_requirement, get_checks, get_failing_params, get_parse_cache_stats, REPORT_MODES
+from shared.helpers import get_client, get_connection_stats, task_output, format_str, get_input, read_artifact, read_stored_artifact, download_revision, get_latest_revision, wait_for_all_jobs
+from shared.artifact_store import get_artifact_store
+from shared.job_manager import get_job_manager
+from shared.metrics import get_metrics, format_cycle
+from shared.revision_watcher import RevisionWatcher
+from shared.validation_cache import get_validation_cache
 from shared.constants import *
 
 
@@ -17,97 +27,183 @@ from shared.constants import *
 ### Functions ###
 #################
 def automated(client: Client,
-              full_extract: bool) -> None:
+              full_extract: bool,
+              report_opts: dict[str, object] = None,
+              debounce: float = WATCH_SETTLE_TIME) -> None:
   cad_mod_id = CAD_MODEL_ID
   cam_mod_id = CAMEO_MODEL_ID
+  report_opts = report_opts or {}
   cad_ext_func = extract_cad_data if full_extract else extract_parameters
 
+  req_spec = ('system requirements',
+              cam_mod_id,
+              REQ_FILE_NAME,
+              extract_requirements)
+  param_spec = ('CAD parameters',
+                cad_mod_id,
+                PARAM_FILE_NAME,
+                cad_ext_func)
+
+  # Results are cached per (Cameo revision, CAD revision) pair, and the
+  # parsed artifacts of the last revision seen on each side are kept so only
+  # the side that changed is fetched again. The incremental validator keeps
+  # the last match set so only changed requirements/parameters are re-checked
+  val_cache = get_validation_cache()
+  inc_val = IncrementalValidator()
+  req_rev_id = reqs_obj = None
+  param_rev_id = params_obj = None
+
+  # Both models are watched; a new revision of either starts a new cycle
+  # once no further revision has arrived for debounce seconds. Revisions
+  # that arrive while a cycle runs are folded into the next one, and a cycle
+  # whose revisions were superseded before its update job is abandoned
+  watcher = RevisionWatcher(client,
+                            settle_time=debounce)
+  watcher.watch([cam_mod_id,
+                 cad_mod_id])
+
   # Execute workflow automatically on startup
   first_run = True
+  superseded = False
+  skipped_count = 0
   while True:
     if first_run:
       first_run = False
     else:
-      cam_rev = wait_for_new_version(CAMEO_MODEL_ID)
+      watcher.wait(settle=superseded)
+      watch_stats = watcher.get_stats()
+      print(f"Watcher requests: {watch_stats['requests']}, "
+            f"revisions: {watch_stats['revisions']}, "
+            f"coalesced: {watch_stats['coalesced']}, "
+            f"skipped cycles: {skipped_count}, "
+            f"mean time to detect: {watch_stats['mean_detect_s'] or 0.0:.1f} s")
+    superseded = False
+    get_metrics().start_cycle('poll')
 
     max_tries = 2
     for try_idx in range(max_tries):
-      print('Retrieving system requirements ...')
-      get_artifact(client,
-                   cam_mod_id,
-                   REQ_FILE_NAME,
-                   extract_requirements)
-
-      print('Retrieving CAD parameters ...')
-      get_artifact(client,
-                   cad_mod_id,
-                   PARAM_FILE_NAME,
-                   cad_ext_func)
-
-      param_reqs = find_param_reqs(REQ_FILE_NAME,
-                                   PARAM_FILE_NAME)
-      print_summary(param_reqs)
-      os.remove(REQ_FILE_NAME)
-      os.remove(PARAM_FILE_NAME)
-
-      fail_param_reqs = get_failing_params(param_reqs)
+      cam_rev_id = get_latest_revision(cam_mod_id,
+                                       client)
+      cad_rev_id = get_latest_revision(cad_mod_id,
+                                       client)
+      val_result = val_cache.get(cam_rev_id,
+                                 cad_rev_id)
+      if val_result is not None:
+        print('Model revisions already validated, using cached result')
+        param_reqs = val_result['param_reqs']
+      else:
+        art_specs = []
+        if req_rev_id != cam_rev_id:
+          art_specs.append(req_spec + (cam_rev_id,))
+        if param_rev_id != cad_rev_id:
+          art_specs.append(param_spec + (cad_rev_id,))
+        art_datas = dict(zip([art_spec[0] for art_spec in art_specs],
+                             get_artifacts(client,
+                                           art_specs)))
+        if req_spec[0] in art_datas:
+          reqs_obj = parse_requirements(art_datas[req_spec[0]])
+          req_rev_id = cam_rev_id
+        if param_spec[0] in art_datas:
+          params_obj = parse_parameters(art_datas[param_spec[0]])
+          param_rev_id = cad_rev_id
+
+        delta = inc_val.update(reqs_obj,
+                               params_obj)
+        print(f"Changes since last validation: {format_delta(delta)}")
+        param_reqs, checks = inc_val.get_checked_pairs()
+        print_summary(param_reqs,
+                      checks,
+                      **report_opts)
+
+      if val_result is None:
+        fail_param_reqs = [param_req for param_req, passed in zip(param_reqs, checks) if not passed]
+        val_cache.put(cam_rev_id,
+                      cad_rev_id,
+                      param_reqs,
+                      fail_param_reqs)
+      else:
+        fail_param_reqs = get_failing_params(param_reqs)
       fail_count = len(fail_param_reqs)
+      print_verdict(fail_count,
+                    report_opts.get('mode'),
+                    report_opts.get('report_file'))
       if fail_count == 0:
-        msg = 'CAD Parameters satisfy all associated requirements'
-        print(f"{format_str(msg, GREEN_COLOR, BOLD_FORMAT)}")
         break
       else:
-        msg = f"{fail_count} failed requirement(s) found"
-        print(f"{format_str(msg, RED_COLOR, BOLD_FORMAT)}")
+        # Do not push an update computed from revisions that are already stale
+        superseded = len(watcher.get_superseded({cam_mod_id: cam_rev_id,
+                                                 cad_mod_id: cad_rev_id})) > 0
+        if superseded:
+          print('Newer model revisions arrived, skipping update for this cycle')
+          skipped_count += 1
+          get_metrics().count('cycles_skipped')
+          break
+
         print('Calculating new values for failing parameters ...')
-        new_params = fix_failing_params(fail_param_reqs)
+        new_params, _ = solve_failing_params(param_reqs,
+                                             fail_param_reqs)
+        if len(new_params) == 0:
+          break
 
         print('Pushing updated parameter values to CAD model ...')
-        save_params_to_input_json(new_params,
-                                  UPDATE_PARAM_FILE_NAME)
-        update_parameters(client,
-                          cad_mod_id,
-                          UPDATE_PARAM_FILE_NAME)
-        os.remove(UPDATE_PARAM_FILE_NAME)
+        cad_rev_id = update_parameters(client,
+                                       cad_mod_id,
+                                       get_update_params(new_params))
+        watcher.mark_seen(cad_mod_id,
+                          cad_rev_id)
+
+    # Revisions validated or created by this cycle do not start a new one
+    if not superseded:
+      watcher.mark_seen(cam_mod_id,
+                        cam_rev_id)
+      watcher.mark_seen(cad_mod_id,
+                        cad_rev_id)
+    report_cycle()
 
 
 def interactive(client: Client,
-                full_extract: bool) -> None:
+                full_extract: bool,
+                report_opts: dict[str, object] = None) -> None:
   cad_mod_id = CAD_MODEL_ID
+  report_opts = report_opts or {}
+  cad_ext_func = extract_cad_data if full_extract else extract_parameters
 
-  print('Retrieving system requirements ...')
-  get_artifact(client,
-               CAMEO_MODEL_ID,
-               REQ_FILE_NAME,
-               extract_requirements)
-  
+  # Requirements are only retrieved on the first pass, alongside the CAD
+  # parameters
+  art_specs = [('system requirements',
+                CAMEO_MODEL_ID,
+                REQ_FILE_NAME,
+                extract_requirements),
+               ('CAD parameters',
+                cad_mod_id,
+                PARAM_FILE_NAME,
+                cad_ext_func)]
+  req_idx = None
   while True:
-    print('Retrieving CAD parameters ...')
-    cad_ext_func = extract_cad_data if full_extract else extract_parameters
-    get_artifact(client,
-                 cad_mod_id,
-                 PARAM_FILE_NAME,
-                 cad_ext_func)
-
-    param_reqs = find_param_reqs(REQ_FILE_NAME,
-                                 PARAM_FILE_NAME)
-    print_summary(param_reqs)
+    report_cycle()
+    get_metrics().start_cycle('interactive')
+    art_datas = get_artifacts(client,
+                              art_specs)
+    if req_idx is None:
+      req_idx = RequirementIndex(parse_requirements(art_datas[0]))
+      art_specs = art_specs[1:]
+
+    param_reqs = match_param_reqs(req_idx,
+                                  parse_parameters(art_datas[-1]))
+    checks = get_checks(param_reqs)
+    print_summary(param_reqs,
+                  checks,
+                  **report_opts)
   
-    fail_param_reqs = []
-    for param_req in param_reqs:
-      param_obj, req_obj = param_req
-      if not check_requirement(param_obj, req_obj):
-        fail_param_reqs.append(param_req)
+    fail_param_reqs = [param_req for param_req, passed in zip(param_reqs, checks) if not passed]
   
     fail_count = len(fail_param_reqs)
+    print_verdict(fail_count,
+                  report_opts.get('mode'),
+                  report_opts.get('report_file'))
     if fail_count == 0:
-      msg = "CAD Parameters satisfy all associated requirements"
-      print(f"{format_str(msg, 32, 1)}")
       break
   
-    msg = f"{fail_count} failed requirement(s) found"
-    print(f"{format_str(msg, 31, 1)}")
-  
     if fail_count > 0:
       ans = get_input('Update failing CAD Parameter values (y,[n])? ',
                       ['y', 'n', 'yes', 'no', ''])
@@ -134,54 +230,225 @@ def interactive(client: Client,
   
       if len(update_params) > 0:
         print('Pushing updated parameter values to CAD model ...')
-        save_params_to_input_json(update_params,
-                                  UPDATE_PARAM_FILE_NAME)
         update_parameters(client,
                           cad_mod_id,
-                          UPDATE_PARAM_FILE_NAME)
-        os.remove(UPDATE_PARAM_FILE_NAME)
+                          get_update_params(update_params))
       else: break
+  report_cycle()
+
+
+def batch(client: Client,
+          cad_mod_ids: list[str],
+          full_extract: bool,
+          max_workers: int = BATCH_MAX_WORKERS) -> list[dict[str, object]]:
+  """
+  Validates every CAD model in cad_mod_ids against the requirements of
+  CAMEO_MODEL_ID and prints one report for all of them.
+
+  The requirements are retrieved and indexed once. The CAD models are then
+  retrieved, matched and checked by a pool of max_workers threads. Failing
+  parameters are reported but not updated.
+  """
+  cad_ext_func = extract_cad_data if full_extract else extract_parameters
+  start_time = perf_counter()
+  get_metrics().start_cycle('batch')
+
+  print('Retrieving system requirements ...')
+  req_idx = RequirementIndex(parse_requirements(get_artifact(client,
+                                                             CAMEO_MODEL_ID,
+                                                             REQ_FILE_NAME,
+                                                             extract_requirements)))
+  req_time = perf_counter() - start_time
+
+  worker_count = max(1, min(max_workers, len(cad_mod_ids)))
+  with task_output() as task_out:
+    def run_task(cad_mod_id):
+      task_out.set_label(cad_mod_id[:8])
+      return validate_model(client,
+                            cad_mod_id,
+                            req_idx,
+                            cad_ext_func)
 
+    with ThreadPoolExecutor(max_workers=worker_count) as pool:
+      results = list(pool.map(run_task, cad_mod_ids))
 
-def create_model_copy(mod_id: str) -> str:
+  wall_time = perf_counter() - start_time
+  print_batch_report(results)
+
+  # Only an estimate of the time one by one: each model's time was measured
+  # while sharing the client, jobs and CPU with the others, so it overstates
+  # what the model would take alone. --workers 1 measures the real figure
+  est_seq_time = req_time + sum(result['seconds'] for result in results)
+  print(f"Wall-clock time: {wall_time:.1f} s with {worker_count} worker(s)")
+  if worker_count > 1:
+    print(f"Estimated time one by one: {est_seq_time:.1f} s from the per-model times "
+          f"(up to {est_seq_time / wall_time if wall_time > 0 else 1.0:.1f}x, run with --workers 1 to measure)")
+  report_cycle()
+  return results
+
+
+def validate_model(client: Client,
+                   cad_mod_id: str,
+                   req_idx: RequirementIndex,
+                   cad_ext_func) -> dict[str, object]:
+  """
+  Retrieves the parameters of one CAD model and checks them against req_idx.
+  Errors are recorded in the result rather than raised so one bad model
+  does not stop the batch.
+  """
+  start_time = perf_counter()
+  result = {'model_id': cad_mod_id,
+            'pairs': 0,
+            'failing': 0,
+            'error': None}
+  try:
+    print('Retrieving CAD parameters ...')
+    param_reqs = match_param_reqs(req_idx,
+                                  parse_parameters(get_artifact(client,
+                                                                cad_mod_id,
+                                                                PARAM_FILE_NAME,
+                                                                cad_ext_func)),
+                                  compact=True)
+    result['pairs'] = len(param_reqs)
+    result['failing'] = len(get_failing_params(param_reqs))
+  except Exception as e:
+    msg = format_str('Validation failed',
+                     RED_COLOR)
+    print(f"{msg}: {e}")
+    result['error'] = str(e)
+
+  result['seconds'] = perf_counter() - start_time
+  return result
+
+
+def print_batch_report(results: list[dict[str, object]]):
+  tab = PrettyTable()
+  header_color = get_column_header_color()
+  tab.field_names = [format_str(col_name, header_color, 1)
+                     for col_name in ['CAD Model', 'Pairs', 'Failing', 'Time (s)', 'Status']]
+  for result in results:
+    if result['error'] is not None:
+      status = format_str('ERROR', RED_COLOR)
+    elif result['failing'] > 0:
+      status = format_str('FAIL', RED_COLOR)
+    else:
+      status = format_str('PASS', GREEN_COLOR)
+    tab.add_row([result['model_id'],
+                 result['pairs'],
+                 result['failing'],
+                 f"{result['seconds']:.1f}",
+                 status])
+
+  tab.align = 'l'
+  print(tab)
+
+  pass_count = sum(1 for result in results if result['error'] is None and result['failing'] == 0)
+  msg = f"{pass_count} of {len(results)} CAD model(s) satisfy all associated requirements"
+  print(format_str(msg, GREEN_COLOR if pass_count == len(results) else RED_COLOR, BOLD_FORMAT))
+
+
+def report_cycle():
+  """
+  Ends the current metrics cycle, if any, and prints its stage breakdown.
+  """
+  record = get_metrics().end_cycle()
+  if record is not None:
+    print(format_cycle(record))
+
+
+def create_model_copy(client: Client,
+                      mod_id: str) -> str:
   mod = client.get_model(mod_id)
-  with open(mod.name, 'wb') as fout:
-    fout.write(mod.file.read_bytes())
-  new_mod_id = client.add_model(mod.name).id
-  os.remove(mod.name)
+  with tempfile.TemporaryDirectory() as tmp_dir:
+    mod_file = os.path.join(tmp_dir, mod.name)
+    download_revision(mod.file.revision,
+                      mod_file,
+                      client)
+    new_mod_id = client.add_model(mod_file).id
   return new_mod_id
 
 
-def save_params_to_input_json(param_objs: list[dict[str, str]],
-                              json_file: str):
-  json_obj = {}
-  json_obj['parameters'] = update_params = {}
+def get_update_params(param_objs: list[dict[str, str]]) -> dict[str, dict[str, str]]:
+  update_params = {}
   for param_obj in param_objs:
     update_params[param_obj['name']] = param_obj['value']
 
-  with open(json_file, 'w') as fout:
-    json.dump(json_obj, fout)
+  return {'parameters': update_params}
+
+
+def get_artifacts(client: Client,
+                  art_specs: list[tuple[str, str, str, object]]) -> list[bytes]:
+  """
+  Retrieves every (label, model id, artifact name, extract function[, model
+  revision id]) artifact in art_specs concurrently, one thread each, and
+  returns their contents in the same order.
+
+  Console output of each retrieval is prefixed with its label and written a
+  line at a time. If any retrieval fails, its exception is re-raised once
+  the others have finished.
+  """
+  if len(art_specs) == 0:
+    return []
+  if len(art_specs) == 1:
+    label, *art_spec = art_specs[0]
+    print(f"Retrieving {label} ...")
+    return [get_artifact(client,
+                         *art_spec)]
+
+  with task_output() as task_out:
+    def run_task(label, *art_spec):
+      task_out.set_label(label)
+      print(f"Retrieving {label} ...")
+      return get_artifact(client,
+                          *art_spec)
+
+    with ThreadPoolExecutor(max_workers=len(art_specs)) as pool:
+      futures = [pool.submit(run_task, *art_spec) for art_spec in art_specs]
+      for future in as_completed(futures):
+        future.result()
+
+  return [future.result() for future in futures]
 
 
 def get_artifact(client: Client,
                  mod_id: str,
-                 art_file_name: str,
-                 extract_function):
+                 art_name: str,
+                 extract_function,
+                 mod_rev_id: str = None) -> bytes:
+  """
+  Returns the contents of the artifact generated by the latest model version,
+  running extract_function to generate it first if it does not exist yet.
+
+  When the caller already knows the latest model revision (mod_rev_id), an
+  artifact in the local artifact store is returned without any registry call.
+  """
+  if mod_rev_id is not None:
+    art_data = read_stored_artifact(mod_id,
+                                    mod_rev_id,
+                                    art_name)
+    if art_data is not None:
+      msg = format_str('Artifact found in local store',
+                       GREEN_COLOR)
+      print(msg)
+      return art_data
+
   print('Searching for artifact ...')
   try:
-    download_artifact(mod_id,
-                      art_file_name,
-                      art_file_name)
+    art_data = read_artifact(mod_id,
+                             art_name,
+                             client)
   except FileNotFoundError:
     msg = format_str('Artifact not found',
                      RED_COLOR)
     print(f"{msg}. Extracting ...")
-    extract_function(client,
-                     mod_id,
-                     art_file_name)
+    art_data = extract_function(client,
+                                mod_id,
+                                art_name,
+                                save_file = False)
   msg = format_str('Artifact downloaded successfully',
                    GREEN_COLOR)
   print(msg)
+  return art_data
 
 
 ### MAIN ###
@@ -189,22 +456,97 @@ if __name__ == '__main__':
   parser = argparse.ArgumentParser(prog='GenAI Demo')
   parser.add_argument('--poll',
                       action='store_true')
+  parser.add_argument('--debounce',
+                      type=float,
+                      default=WATCH_SETTLE_TIME,
+                      metavar='SECONDS',
+                      help='In --poll mode, start a cycle once no new model revision has arrived for this long')
   parser.add_argument('--full_extract',
                       action='store_true')
+  parser.add_argument('--batch',
+                      nargs='+',
+                      metavar='CAD_MODEL_ID',
+                      help='Validate these CAD models against the Cameo requirements')
+  parser.add_argument('--report',
+                      choices=REPORT_MODES,
+                      help='Report format for matched pairs (default: table, or failing pairs as lines '
+                           f"for more than {REPORT_TABLE_MAX_ROWS} pairs)")
+  parser.add_argument('--failures_only',
+                      action='store_true',
+                      help='Only report pairs that fail their requirement')
+  parser.add_argument('--limit',
+                      type=int,
+                      metavar='N',
+                      help='Report at most N pairs')
+  parser.add_argument('--offset',
+                      type=int,
+                      default=0,
+                      metavar='N',
+                      help='Skip the first N pairs of the report, to read it a page at a time')
+  parser.add_argument('--rank',
+                      action='store_true',
+                      help='Report failing pairs furthest from a passing value first')
+  parser.add_argument('--report_file',
+                      help='Write jsonl or csv reports to this file instead of stdout')
+  parser.add_argument('--metrics',
+                      default=METRICS_FILE,
+                      metavar='JSONL_FILE',
+                      help='Record per-stage timings and append one JSON line per cycle to this file')
+  parser.add_argument('--metrics_prom',
+                      default=METRICS_PROM_FILE,
+                      metavar='PROM_FILE',
+                      help='Record per-stage timings and write run totals in Prometheus text format to this file')
+  parser.add_argument('--workers',
+                      type=int,
+                      default=BATCH_MAX_WORKERS,
+                      help='Number of CAD models validated at once in --batch mode')
   args = parser.parse_args()
+  report_opts = {'mode': args.report,
+                 'failures_only': args.failures_only,
+                 'limit': args.limit,
+                 'offset': args.offset,
+                 'rank': args.rank,
+                 'report_file': args.report_file}
 
   client = get_client()
+  if args.metrics or args.metrics_prom:
+    get_metrics().enable(args.metrics)
 
   try:
-    if args.poll:
+    if args.batch:
+      batch(client,
+            args.batch,
+            args.full_extract,
+            args.workers)
+    elif args.poll:
       automated(client,
-                args.full_extract)
+                args.full_extract,
+                report_opts,
+                args.debounce)
     else:
       interactive(client,
-                  args.full_extract)
+                  args.full_extract,
+                  report_opts)
   except KeyboardInterrupt:
     print("\nWaiting for any executing jobs to complete ...")
-    wait_for_all_jobs()
+    wait_for_all_jobs(client)
     print('Shutting down')
     sys.exit(0)
+  finally:
+    conn_stats = get_connection_stats(client)
+    print(f"HTTP connections opened: {conn_stats['opened']}, "
+          f"reused: {conn_stats['reused']}")
+    for cache_name, cache_stats in get_parse_cache_stats().items():
+      print(f"Parsed {cache_name} cache hits: {cache_stats['hits']}, "
+            f"misses: {cache_stats['misses']}")
+    store_stats = get_artifact_store().get_stats()
+    print(f"Artifact store hits: {store_stats['hits']}, "
+          f"misses: {store_stats['misses']}, "
+          f"saved: {store_stats['bytes_saved'] / 1e6:.1f} MB")
+    job_stats = get_job_manager().get_stats()
+    print(f"Jobs submitted: {job_stats['submitted']}, "
+          f"attached to existing jobs: {job_stats['attached']}, "
+          f"waited for a free slot: {job_stats['blocked']}")
+    if args.metrics_prom:
+      get_metrics().write_prometheus(args.metrics_prom)
 
@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+
+from shared.constants import ARTIFACT_INDEX_FILE
+
+
+class ArtifactIndex():
+  """
+  On-disk index from (model id, model revision id, artifact name) to the id
+  of the artifact revision generated by that model revision.
+
+  Every artifact page listed for a model is folded into the index, so one
+  walk through the listing answers later lookups for other artifacts and
+  revisions without listing again. The index also remembers the last page
+  scanned for each model, so a miss first resumes from there before falling
+  back to a full rescan.
+  """
+
+  def __init__(self,
+               index_file: str = ARTIFACT_INDEX_FILE):
+    self.index_file = index_file
+    self.lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.list_calls = 0
+    self.models = {}
+    if os.path.exists(index_file):
+      try:
+        with open(index_file, 'r') as fin:
+          self.models = json.load(fin)
+      except (OSError, ValueError):
+        self.models = {}
+
+  @staticmethod
+  def entry_key(mod_rev_id: str,
+                art_name: str) -> str:
+    return f"{mod_rev_id}/{art_name}"
+
+  def get_model(self,
+                mod_id: str) -> dict[str, object]:
+    return self.models.setdefault(mod_id, {'last_page': 1,
+                                           'entries': {}})
+
+  def lookup(self,
+             mod_id: str,
+             mod_rev_id: str,
+             art_name: str) -> str:
+    with self.lock:
+      entries = self.get_model(mod_id)['entries']
+      art_rev_id = entries.get(self.entry_key(mod_rev_id, art_name))
+      if art_rev_id is None:
+        self.misses += 1
+      else:
+        self.hits += 1
+      return art_rev_id
+
+  def invalidate(self,
+                 mod_id: str,
+                 mod_rev_id: str,
+                 art_name: str) -> None:
+    with self.lock:
+      entries = self.get_model(mod_id)['entries']
+      entries.pop(self.entry_key(mod_rev_id, art_name), None)
+
+  def add_page(self,
+               mod_id: str,
+               page_idx: int,
+               arts: list) -> None:
+    """
+    Records every artifact revision on one listing page. The first revision
+    seen for a key wins, matching the page order download_artifact searches.
+    """
+    with self.lock:
+      mod_idx = self.get_model(mod_id)
+      entries = mod_idx['entries']
+      for art in arts:
+        for art_rev in art.revisions:
+          for art_rev_src in art_rev.sources or []:
+            entries.setdefault(self.entry_key(art_rev_src.revision_id, art.name),
+                               art_rev.id)
+      mod_idx['last_page'] = max(mod_idx['last_page'], page_idx)
+
+  def get_last_page(self,
+                    mod_id: str) -> int:
+    with self.lock:
+      return self.get_model(mod_id)['last_page']
+
+  def save(self) -> None:
+    with self.lock:
+      index_dir = os.path.dirname(self.index_file)
+      if index_dir:
+        os.makedirs(index_dir, exist_ok=True)
+      tmp_file = f"{self.index_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+      with open(tmp_file, 'w') as fout:
+        json.dump(self.models, fout)
+      os.replace(tmp_file, self.index_file)
+
+  def get_stats(self) -> dict[str, int]:
+    return {'hits': self.hits,
+            'misses': self.misses,
+            'list_calls': self.list_calls}
+
+
+artifact_index = None
+
+def get_artifact_index() -> ArtifactIndex:
+  global artifact_index
+  if artifact_index is None:
+    artifact_index = ArtifactIndex()
+  return artifact_index
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+from contextlib import contextmanager
+from time import sleep, time
+
+from shared.metrics import get_metrics
+from shared.constants import DOWNLOAD_CHUNK_SIZE, ARTIFACT_STORE_DIR, ARTIFACT_STORE_MAX_BYTES, ARTIFACT_STORE_MAX_AGE
+
+
+@contextmanager
+def lock_file(lock_path: str):
+  """
+  Holds an exclusive lock on lock_path, shared between processes.
+  """
+  with open(lock_path, 'a+b') as fout:
+    if os.name == 'nt':
+      import msvcrt
+      fout.seek(0)
+      while True:
+        try:
+          msvcrt.locking(fout.fileno(), msvcrt.LK_LOCK, 1)
+          break
+        except OSError:
+          # LK_LOCK gives up after about 10 s
+          sleep(0.1)
+      try:
+        yield
+      finally:
+        fout.seek(0)
+        msvcrt.locking(fout.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+      import fcntl
+      fcntl.flock(fout, fcntl.LOCK_EX)
+      try:
+        yield
+      finally:
+        fcntl.flock(fout, fcntl.LOCK_UN)
+
+
+class ArtifactStore():
+  """
+  Local content-addressed store of artifact contents, shared by every
+  process on the machine.
+
+  Contents are saved once per SHA-256 under objects/, and artifact
+  revision ids map onto them, so the same revision is never downloaded
+  twice and identical contents of different revisions share one file. The
+  index and objects are only changed while holding an exclusive file lock.
+  Objects not read for max_age seconds are dropped, then the least recently
+  read ones are evicted until the store fits in max_bytes.
+  """
+
+  def __init__(self,
+               store_dir: str = ARTIFACT_STORE_DIR,
+               max_bytes: int = ARTIFACT_STORE_MAX_BYTES,
+               max_age: float = ARTIFACT_STORE_MAX_AGE):
+    self.store_dir = store_dir
+    self.max_bytes = max_bytes
+    self.max_age = max_age
+    self.index_file = os.path.join(store_dir, 'index.json')
+    self.lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.bytes_saved = 0
+    self.evictions = 0
+
+  def get_object_file(self,
+                      content_hash: str) -> str:
+    return os.path.join(self.store_dir, 'objects', content_hash[:2], content_hash)
+
+  @contextmanager
+  def open_index(self):
+    """
+    Locks the store and yields its index, which is saved on exit.
+    """
+    os.makedirs(self.store_dir, exist_ok=True)
+    with self.lock, lock_file(os.path.join(self.store_dir, 'lock')):
+      index = {'revisions': {},
+               'objects': {}}
+      if os.path.exists(self.index_file):
+        try:
+          with open(self.index_file, 'r') as fin:
+            index = json.load(fin)
+        except (OSError, ValueError):
+          pass
+      yield index
+
+      tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+      with open(tmp_file, 'w') as fout:
+        json.dump(index, fout)
+      os.replace(tmp_file, self.index_file)
+
+  def get(self,
+          art_rev_id: str) -> bytes:
+    """
+    Returns the stored contents of an artifact revision, or None.
+    """
+    metrics = get_metrics()
+    with self.open_index() as index:
+      content_hash = index['revisions'].get(art_rev_id)
+      obj = index['objects'].get(content_hash)
+      data = None
+      if obj is not None:
+        try:
+          with open(self.get_object_file(content_hash), 'rb') as fin:
+            data = fin.read()
+        except OSError:
+          data = None
+        if data is None or len(data) != obj['size']:
+          self.drop_object(index, content_hash)
+          data = None
+        else:
+          obj['last_access'] = time()
+
+      if data is None:
+        self.misses += 1
+        metrics.count('artifact_store_misses')
+      else:
+        self.hits += 1
+        self.bytes_saved += len(data)
+        metrics.count('artifact_store_hits')
+        metrics.count('artifact_store_bytes_saved', len(data))
+      return data
+
+  def put(self,
+          art_rev_id: str,
+          data: bytes) -> None:
+    """
+    Stores the contents of an artifact revision and evicts what no longer
+    fits.
+    """
+    def write_object(fout):
+      fout.write(data)
+
+    self.add_object(art_rev_id,
+                    hashlib.sha256(data).hexdigest(),
+                    len(data),
+                    write_object)
+
+  def put_file(self,
+               art_rev_id: str,
+               file_name: str,
+               chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> None:
+    """
+    Stores the contents of file_name as an artifact revision, hashing and
+    copying it chunk_size bytes at a time.
+    """
+    content_hash = hashlib.sha256()
+    with open(file_name, 'rb') as fin:
+      while True:
+        chunk = fin.read(chunk_size)
+        if len(chunk) == 0:
+          break
+        content_hash.update(chunk)
+
+    def write_object(fout):
+      with open(file_name, 'rb') as fin:
+        shutil.copyfileobj(fin, fout, chunk_size)
+
+    self.add_object(art_rev_id,
+                    content_hash.hexdigest(),
+                    os.path.getsize(file_name),
+                    write_object)
+
+  def add_object(self,
+                 art_rev_id: str,
+                 content_hash: str,
+                 size: int,
+                 write_object) -> None:
+    with self.open_index() as index:
+      obj_file = self.get_object_file(content_hash)
+      if not content_hash in index['objects'] or not os.path.exists(obj_file):
+        os.makedirs(os.path.dirname(obj_file), exist_ok=True)
+        tmp_file = f"{obj_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as fout:
+          write_object(fout)
+        os.replace(tmp_file, obj_file)
+      index['objects'][content_hash] = {'size': size,
+                                        'last_access': time()}
+      index['revisions'][art_rev_id] = content_hash
+      self.evict(index)
+
+  def evict(self,
+            index: dict[str, dict]) -> None:
+    objs = index['objects']
+    expire_time = time() - self.max_age
+    total_size = sum(obj['size'] for obj in objs.values())
+    for content_hash, obj in sorted(objs.items(), key=lambda item: item[1]['last_access']):
+      if obj['last_access'] >= expire_time and total_size <= self.max_bytes:
+        break
+      total_size -= obj['size']
+      self.drop_object(index, content_hash)
+      self.evictions += 1
+
+  def drop_object(self,
+                  index: dict[str, dict],
+                  content_hash: str) -> None:
+    index['objects'].pop(content_hash, None)
+    for art_rev_id in [art_rev_id for art_rev_id, rev_hash in index['revisions'].items() if rev_hash == content_hash]:
+      del index['revisions'][art_rev_id]
+    try:
+      os.remove(self.get_object_file(content_hash))
+    except OSError:
+      pass
+
+  def get_stats(self) -> dict[str, int]:
+    return {'hits': self.hits,
+            'misses': self.misses,
+            'bytes_saved': self.bytes_saved,
+            'evictions': self.evictions}
+
+
+artifact_store = None
+
+def get_artifact_store() -> ArtifactStore:
+  global artifact_store
+  if artifact_store is None:
+    artifact_store = ArtifactStore()
+  return artifact_store
@@ -1,62 +1,123 @@
-from time import sleep
+from __future__ import annotations
 
-from istari_digital_client import Client, Configuration, Job, Model
-from istari_digital_client.models import JobStatusName
-from shared.constants import REG_URL, REG_AUTH_TOKEN
+import hashlib
+import os
+import re
+import sys
+import threading
 
+from contextlib import contextmanager
+from time import perf_counter
+from typing import TYPE_CHECKING
 
-job_list = []
+from shared.artifact_index import get_artifact_index
+from shared.artifact_store import get_artifact_store
+from shared.metrics import get_metrics, timed
+from shared.constants import REG_URL, REG_AUTH_TOKEN, CONNECTION_POOL_SIZE, DOWNLOAD_CHUNK_SIZE, UPLOAD_CHUNK_SIZE, UPLOAD_MULTIPART_THRESHOLD
 
-def get_client():
-  configuration = Configuration(
-      registry_url=REG_URL,
-      registry_auth_token=REG_AUTH_TOKEN)
+# The client SDK takes over a second to import, so it is only imported by
+# the functions that talk to the registry
+if TYPE_CHECKING:
+  from istari_digital_client import Client, Job, Model
 
-  return Client(config = configuration)
 
+shared_client = None
 
+def get_client() -> Client:
+  """
+  Returns the process-wide registry client, creating it on first use.
+
+  The client owns a urllib3 pool manager, so reusing a single instance keeps
+  HTTP connections alive between calls instead of paying a new TLS handshake
+  on every poll.
+  """
+  global shared_client
+  if shared_client is None:
+    from istari_digital_client import Client, Configuration
+    configuration = Configuration(
+        registry_url=REG_URL,
+        registry_auth_token=REG_AUTH_TOKEN,
+        multipart_chunksize=UPLOAD_CHUNK_SIZE,
+        multipart_threshold=UPLOAD_MULTIPART_THRESHOLD)
+    configuration.connection_pool_maxsize = CONNECTION_POOL_SIZE
+
+    shared_client = Client(config = configuration)
+
+  return shared_client
+
+
+def get_connection_stats(client: Client = None) -> dict[str, int]:
+  """
+  Returns the number of HTTP connections opened by the client and how many
+  requests were served over an already open (reused) connection.
+  """
+  client = client or get_client()
+  pools = client.api_client.rest_client.pool_manager.pools
+  opened = 0
+  requests = 0
+  for pool_key in pools.keys():
+    pool = pools[pool_key]
+    if pool is None: continue
+    opened += pool.num_connections
+    requests += pool.num_requests
+
+  return {'opened': opened,
+          'reused': max(requests - opened, 0),
+          'requests': requests}
+
+
+@timed('submit_job')
 def submit_job(model_id: str,
                function: str,
                tool_name: str,
                tool_ver: str = None,
-               params_file: str = None) -> Job:
-  client = get_client()
-  job =  client.add_job(model_id,
-                        function = function,
-                        tool_name = tool_name,
-                        tool_version = tool_ver,
-                        parameters_file = params_file)
-  job_list.append(job.id)
-  return job
-
-
-def wait_for_job(job) -> Job:
-  client = get_client()
-  empty_str = ' ' * 64
-  while not job.status.name in [JobStatusName.COMPLETED, 
-                                JobStatusName.FAILED]:
-    sleep(1)
-    job = client.get_job(job.id)
-    print(empty_str, end="\r")
-    job_stat = format_str(job.status.name, 1)
-    print(f"Job Status: {job_stat}", end="\r")
-
-  if job.id in job_list:
-    job_list.remove(job.id)
-
-  print(empty_str, end="\r")
-  return job
-
-
-def wait_for_all_jobs():
-  client = get_client()
-  for job_id in job_list:
-    job = client.get_job(job_id)
-    wait_for_job(job)
-
-
-def get_latest_revision(model_id: str) -> str:
-  client = get_client()
+               params_file: str = None,
+               client: Client = None,
+               params: dict[str, object] = None) -> Job:
+  """
+  Submits a job for the model. Job parameters are taken from params_file, or
+  from the params dict, which the client serializes itself.
+
+  Jobs go through the job manager, so a job already running or completed
+  for the same model revision, function, tool and parameters is returned
+  instead of being submitted again.
+  """
+  from shared.job_manager import get_job_manager
+  client = client or get_client()
+  return get_job_manager().submit(client,
+                                  model_id,
+                                  function,
+                                  tool_name,
+                                  tool_ver,
+                                  params_file,
+                                  params)
+
+
+@timed('wait_for_job')
+def wait_for_job(job,
+                 client: Client = None) -> Job:
+  from shared.job_monitor import wait_for_jobs
+  client = client or get_client()
+  return wait_for_jobs([job],
+                       client)[0]
+
+
+def wait_for_all_jobs(client: Client = None) -> list[Job]:
+  """
+  Waits on every job still running at the same time, so shutdown takes as
+  long as the slowest job rather than the sum of all of them.
+  """
+  from shared.job_manager import get_job_manager
+  from shared.job_monitor import wait_for_jobs
+  client = client or get_client()
+  jobs = [client.get_job(job_id) for job_id in get_job_manager().get_running_ids()]
+  return wait_for_jobs(jobs,
+                       client)
+
+
+def get_latest_revision(model_id: str,
+                        client: Client = None) -> str:
+  client = client or get_client()
   mod = client.get_model(model_id)
   mod_revs = mod.file.revisions
   ret_rev = None
@@ -67,35 +128,24 @@ def get_latest_revision(model_id: str) -> str:
   return ret_rev.id
   
 
-def wait_for_new_version(model_id: str) -> Model:
-  client = get_client()
-  empty_str = ' ' * 64
-  mod = client.get_model(model_id)
-  revs = mod.file.revisions
-  mod_name = revs[0].display_name
-  latest_rev = revs[-1]
-  rev_count = len(revs)
-  while True:
-    print(empty_str, end="\r")
-    print(f"Polling for model updates: {mod_name}",
-          end="\r")
-    sleep(5)
-    mod = client.get_model(model_id)
-    revs = mod.file.revisions
-    new_rev_count = len(revs)
-    if new_rev_count != rev_count:
-      latest_rev = revs[-1]
-      break
+def wait_for_new_version(model_id: str,
+                         client: Client = None) -> Model:
+  """
+  Blocks until model_id has a new revision and returns it.
+  """
+  from shared.revision_watcher import RevisionWatcher
 
-  print(empty_str, end="\r")
-  print(f"Model update detected: {mod_name}")
-  return latest_rev
+  client = client or get_client()
+  watcher = RevisionWatcher(client)
+  watcher.watch([model_id])
+  return watcher.wait()[model_id]
 
 
 def download_artifact_orig(model_id: str,
                       artifact_name: str,
-                      dest_file: str = None):
-  client = get_client()
+                      dest_file: str = None,
+                      client: Client = None):
+  client = client or get_client()
   art = None
   pg_idx = 1
   while True:
@@ -122,42 +172,219 @@ def download_artifact_orig(model_id: str,
       fout.write(art.read_bytes())
 
 
+@timed('find_artifact')
+def find_artifact_revision(model_id: str,
+                           mod_rev_id: str,
+                           artifact_name: str,
+                           client: Client = None):
+  """
+  Returns the revision of artifact_name generated by model revision
+  mod_rev_id, or None if there is none.
+
+  Known revisions resolve straight from the artifact index without listing
+  any artifacts. Otherwise the listing is scanned from the last page seen
+  for the model onwards, then from the first page up to it, and every page
+  read is added to the index.
+  """
+  from istari_digital_client import ApiException
+  client = client or get_client()
+  art_idx = get_artifact_index()
+  art_rev_id = art_idx.lookup(model_id,
+                              mod_rev_id,
+                              artifact_name)
+  if art_rev_id is not None:
+    try:
+      return client.get_revision(art_rev_id)
+    except ApiException:
+      # Stale entry (e.g. revision archived), fall back to the listing
+      art_idx.invalidate(model_id,
+                         mod_rev_id,
+                         artifact_name)
+
+  last_pg_idx = art_idx.get_last_page(model_id)
+  pg_ranges = [(last_pg_idx, None), (1, last_pg_idx)]
+  for pg_idx, end_pg_idx in pg_ranges:
+    while pg_idx != end_pg_idx:
+      art_list = client.list_model_artifacts(model_id,
+                                             page = pg_idx)
+      art_idx.list_calls += 1
+      get_metrics().count('artifact_list_calls')
+      arts = art_list.items
+      if len(arts) == 0:
+        break
+      art_idx.add_page(model_id,
+                       pg_idx,
+                       arts)
+
+      # Find artifact with name matching artifact_name and generated by the
+      # requested version of the model
+      for art in arts:
+        if art.name == artifact_name:
+          for art_rev in art.revisions:
+            for art_rev_src in art_rev.sources:
+              if art_rev_src.revision_id == mod_rev_id:
+                art_idx.save()
+                return art_rev
+
+      pg_idx += 1
+
+  art_idx.save()
+  return None
+
+
+def get_latest_artifact_revision(model_id: str,
+                                 artifact_name: str,
+                                 client: Client = None):
+  """
+  Returns the revision of artifact_name generated by the latest version of
+  the model.
+
+  Throws FileNotFoundError if the artifact is not found.
+  """
+  client = client or get_client()
+  mod = client.get_model(model_id)
+  mod_rev_id = mod.file.revisions[-1].id
+
+  art_rev = find_artifact_revision(model_id,
+                                   mod_rev_id,
+                                   artifact_name,
+                                   client)
+  if art_rev is None:
+    raise FileNotFoundError(f"Artifact not found: {artifact_name}")
+  return art_rev
+
+
+@timed('download_artifact')
+def read_artifact(model_id: str,
+                  artifact_name: str,
+                  client: Client = None) -> bytes:
+  """
+  Returns the contents of the artifact associated with the latest version of
+  the model without writing it to disk. Revisions already in the local
+  artifact store are not downloaded again.
+
+  Throws FileNotFoundError if the artifact is not found.
+  """
+  client = client or get_client()
+  art_rev = get_latest_artifact_revision(model_id,
+                                         artifact_name,
+                                         client)
+  art_store = get_artifact_store()
+  art_data = art_store.get(art_rev.id)
+  if art_data is None:
+    art_data = client.read_contents(art_rev.content_token)
+    get_metrics().count('download_bytes', len(art_data))
+    art_store.put(art_rev.id,
+                  art_data)
+  return art_data
+
+
+def read_stored_artifact(model_id: str,
+                         mod_rev_id: str,
+                         artifact_name: str) -> bytes:
+  """
+  Returns the contents of the artifact generated by model revision
+  mod_rev_id from the artifact index and local store alone, without any
+  registry call, or None if either does not have it.
+  """
+  art_rev_id = get_artifact_index().lookup(model_id,
+                                           mod_rev_id,
+                                           artifact_name)
+  if art_rev_id is None:
+    return None
+  return get_artifact_store().get(art_rev_id)
+
+
+@timed('download_artifact')
 def download_artifact(model_id: str,
                       artifact_name: str,
-                      dest_file: str = None) -> None:
+                      dest_file: str = None,
+                      client: Client = None) -> None:
   """
   Downloads the artifact associated with the latest version of the model.
+  Revisions already in the local artifact store are copied from it.
 
   Throws FileNotFoundError if the artifact is not found.
   """
-  client = get_client()
-  mod = client.get_model(model_id)
-  mod_rev_id = mod.file.revisions[-1].id
+  client = client or get_client()
+  art_rev = get_latest_artifact_revision(model_id,
+                                         artifact_name,
+                                         client)
+  if dest_file is None:
+    dest_file = artifact_name
+  art_store = get_artifact_store()
+  art_data = art_store.get(art_rev.id)
+  if art_data is not None:
+    tmp_file = f"{dest_file}.part"
+    with open(tmp_file, 'wb') as fout:
+      fout.write(art_data)
+    os.replace(tmp_file, dest_file)
+    return
+
+  download_revision(art_rev,
+                    dest_file,
+                    client)
+  art_store.put_file(art_rev.id,
+                     dest_file)
+
+
+def download_revision(file_rev,
+                      dest_file: str,
+                      client: Client = None,
+                      chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> dict[str, float]:
+  """
+  Writes the contents of a file revision to dest_file in chunk_size pieces.
 
-  pg_idx = 1
-  while True:
-    art_list = client.list_model_artifacts(model_id,
-                                           page = pg_idx)
-    arts = art_list.items
-    if len(arts) == 0:
-      break
-    
-    # Find artifact with name matching artifact_name and generated by the latest
-    # version of the model
-    for art in arts:
-      if art.name == artifact_name:
-        for art_rev in art.revisions:
-          for art_rev_src in art_rev.sources:
-            if art_rev_src.revision_id == mod_rev_id:
-              if dest_file is None:
-                dest_file = artifact_name
-              with open(dest_file, 'wb') as fout:
-                fout.write(art_rev.read_bytes())
-              return
+  The data goes to '<dest_file>.part' first and is renamed into place once
+  complete, so dest_file is never left half written.
 
-    pg_idx += 1
+  The client can only fetch whole revisions, so one copy of the content is
+  held in memory while it is written out; reading through the client
+  directly avoids the second copy its filesystem cache would make.
+
+  Returns the transfer size, duration and throughput.
+  """
+  client = client or get_client()
+  start_time = perf_counter()
+  part_file = f"{dest_file}.part"
+
+  data = memoryview(client.read_contents(file_rev.content_token))
+  with open(part_file, 'wb') as fout:
+    for chunk_start in range(0, len(data), chunk_size):
+      fout.write(data[chunk_start:chunk_start + chunk_size])
+  size = len(data)
+  data.release()
+  os.replace(part_file, dest_file)
+
+  elapsed = perf_counter() - start_time
+  get_metrics().count('download_bytes', size)
+  return {'bytes': size,
+          'seconds': elapsed,
+          'mb_per_s': size / 1e6 / elapsed if elapsed > 0 else 0.0}
+
+
+def get_content_sha(file_name: str,
+                    salt: str,
+                    chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> str:
+  """
+  Returns the registry content hash of file_name for the given token salt,
+  reading the file chunk_size bytes at a time. Registry content tokens are
+  the SHA-384 of the content followed by the salt.
+  """
+  content_hash = hashlib.sha384()
+  with open(file_name, 'rb') as fin:
+    while True:
+      chunk = fin.read(chunk_size)
+      if len(chunk) == 0:
+        break
+      content_hash.update(chunk)
+  content_hash.update(salt.encode())
+  return content_hash.hexdigest()
 
-  raise FileNotFoundError(f"Artifact not found: {artifact_name}")
+
+def format_transfer_stats(xfer_stats: dict[str, float]) -> str:
+  return (f"{xfer_stats['bytes'] / 1e6:.1f} MB in {xfer_stats['seconds']:.1f} s "
+          f"({xfer_stats['mb_per_s']:.1f} MB/s)")
 
 
 def get_input(msg: str,
@@ -185,3 +412,65 @@ def format_str(text: str,
 
   return f"{fmt_str}m{text}{FMT_PREFIX}0m"
 
+
+class TaskOutput():
+  """
+  sys.stdout stand-in that keeps output from concurrent tasks readable.
+
+  Text written by a thread that has been given a label is split on line and
+  carriage-return boundaries, and each complete segment is written whole,
+  prefixed with the label, while holding a lock. Output from unlabelled
+  threads passes straight through.
+  """
+
+  def __init__(self, stream):
+    self.stream = stream
+    self.lock = threading.Lock()
+    self.local = threading.local()
+
+  def set_label(self,
+                label: str):
+    self.local.label = label
+    self.local.pending = ''
+
+  def write(self,
+            text: str) -> int:
+    label = getattr(self.local, 'label', None)
+    if label is None:
+      with self.lock:
+        return self.stream.write(text)
+
+    segs = re.split(r"([\r\n])", self.local.pending + text)
+    self.local.pending = segs[-1]
+    out_str = ''
+    for seg_text, seg_end in zip(segs[0:-1:2], segs[1::2]):
+      if seg_text.strip():
+        out_str += f"\033[K[{label}] {seg_text}{seg_end}"
+      else:
+        out_str += f"{seg_text}{seg_end}"
+
+    if out_str:
+      with self.lock:
+        self.stream.write(out_str)
+        self.stream.flush()
+    return len(text)
+
+  def flush(self):
+    with self.lock:
+      self.stream.flush()
+
+  def __getattr__(self, name: str):
+    return getattr(self.stream, name)
+
+
+@contextmanager
+def task_output():
+  """
+  Installs a TaskOutput on sys.stdout for the duration of the block.
+  """
+  orig_stdout = sys.stdout
+  task_out = sys.stdout = TaskOutput(orig_stdout)
+  try:
+    yield task_out
+  finally:
+    sys.stdout = orig_stdout
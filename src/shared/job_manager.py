@@ -0,0 +1,173 @@
+import hashlib
+import json
+import threading
+
+from istari_digital_client import Client, Job
+from istari_digital_client.models import JobStatusName
+from shared.metrics import get_metrics
+from shared.constants import JOB_MAX_RUNNING, JOB_POLL_MIN_INTERVAL
+
+
+DONE_STATUSES = [JobStatusName.COMPLETED,
+                 JobStatusName.FAILED]
+
+
+def get_params_hash(params: dict[str, object] = None,
+                    params_file: str = None) -> str:
+  """
+  Returns a hash of the job parameters, read from params_file if given.
+  """
+  if params_file is not None:
+    with open(params_file, 'rb') as fin:
+      params_data = fin.read()
+  else:
+    params_data = json.dumps(params,
+                             sort_keys=True,
+                             default=str).encode()
+  return hashlib.sha256(params_data).hexdigest()
+
+
+class JobManager():
+  """
+  Tracks every job submitted by this process, keyed by (model revision,
+  function, tool, tool version, parameters hash).
+
+  Submitting a job whose key matches one that is running or has completed
+  returns that job instead of starting a new one; only failed jobs are
+  submitted again. At most max_running jobs are in flight at once; further
+  submissions block until a running job finishes. Finished jobs are
+  reported by JobMonitor, and a blocked submitter also checks the running
+  jobs itself every poll_interval seconds, so a slot is freed even when no
+  one is waiting on the job.
+  """
+
+  def __init__(self,
+               max_running: int = JOB_MAX_RUNNING,
+               poll_interval: float = JOB_POLL_MIN_INTERVAL):
+    self.max_running = max_running
+    self.poll_interval = poll_interval
+    self.cond = threading.Condition()
+    self.jobs = {}
+    self.running = {}
+    self.submitted = 0
+    self.attached = 0
+    self.blocked = 0
+
+  def get_job_key(self,
+                  client: Client,
+                  model_id: str,
+                  function: str,
+                  tool_name: str,
+                  tool_ver: str = None,
+                  params_file: str = None,
+                  params: dict[str, object] = None) -> tuple[str, ...]:
+    from shared.helpers import get_latest_revision
+    return (get_latest_revision(model_id, client),
+            function,
+            tool_name,
+            tool_ver,
+            get_params_hash(params, params_file))
+
+  def submit(self,
+             client: Client,
+             model_id: str,
+             function: str,
+             tool_name: str,
+             tool_ver: str = None,
+             params_file: str = None,
+             params: dict[str, object] = None) -> Job:
+    """
+    Returns the existing job for the same key, or submits a new one once
+    fewer than max_running jobs are in flight.
+    """
+    job_key = self.get_job_key(client,
+                               model_id,
+                               function,
+                               tool_name,
+                               tool_ver,
+                               params_file,
+                               params)
+    was_blocked = False
+    while True:
+      with self.cond:
+        job = self.jobs.get(job_key, False)
+        if job is None:
+          # Another thread is submitting the same job
+          self.cond.wait()
+          continue
+        if job and job.status.name != JobStatusName.FAILED:
+          self.attached += 1
+          get_metrics().count('jobs_attached')
+          return job
+        if len(self.running) < self.max_running:
+          self.jobs[job_key] = None
+          break
+        if not was_blocked:
+          was_blocked = True
+          self.blocked += 1
+          get_metrics().count('jobs_blocked')
+        self.cond.wait(self.poll_interval)
+        running_ids = list(self.running)
+      self.refresh(client,
+                   running_ids)
+
+    try:
+      job = client.add_job(model_id,
+                           function = function,
+                           tool_name = tool_name,
+                           tool_version = tool_ver,
+                           parameters = params,
+                           parameters_file = params_file)
+    except BaseException:
+      with self.cond:
+        del self.jobs[job_key]
+        self.cond.notify_all()
+      raise
+
+    with self.cond:
+      self.jobs[job_key] = job
+      if not job.status.name in DONE_STATUSES:
+        self.running[job.id] = job_key
+      self.submitted += 1
+      self.cond.notify_all()
+    get_metrics().count('jobs_submitted')
+    return job
+
+  def refresh(self,
+              client: Client,
+              job_ids: list[str]) -> None:
+    for job_id in job_ids:
+      job = client.get_job(job_id)
+      if job.status.name in DONE_STATUSES:
+        self.finish(job)
+
+  def finish(self,
+             job: Job) -> None:
+    """
+    Records a job's final status and frees its slot.
+    """
+    with self.cond:
+      job_key = self.running.pop(job.id, None)
+      if job_key is not None:
+        self.jobs[job_key] = job
+        self.cond.notify_all()
+
+  def get_running_ids(self) -> list[str]:
+    with self.cond:
+      return list(self.running)
+
+  def get_stats(self) -> dict[str, int]:
+    with self.cond:
+      return {'submitted': self.submitted,
+              'attached': self.attached,
+              'blocked': self.blocked,
+              'running': len(self.running)}
+
+
+job_manager = None
+
+def get_job_manager() -> JobManager:
+  global job_manager
+  if job_manager is None:
+    job_manager = JobManager()
+  return job_manager
@@ -0,0 +1,94 @@
+import asyncio
+
+from time import perf_counter
+
+from istari_digital_client import Client, Job
+from shared.constants import JOB_POLL_MIN_INTERVAL, JOB_POLL_MAX_INTERVAL, JOB_POLL_BACKOFF
+from shared.helpers import format_str
+from shared.job_manager import DONE_STATUSES, get_job_manager
+from shared.metrics import get_metrics
+
+
+class JobMonitor():
+  """
+  Waits on any number of Istari jobs concurrently from one event loop.
+
+  Each job is polled on its own schedule: the interval starts at
+  min_interval and grows by backoff (up to max_interval) for every poll that
+  sees no status change, so short jobs finish quickly while long CAD jobs are
+  polled less often. All jobs share a single status line.
+
+  The client only needs a get_job(job_id) method, so a fake client that steps
+  through job states can stand in for the registry.
+  """
+
+  def __init__(self,
+               client: Client,
+               min_interval: float = JOB_POLL_MIN_INTERVAL,
+               max_interval: float = JOB_POLL_MAX_INTERVAL,
+               backoff: float = JOB_POLL_BACKOFF,
+               show_status: bool = True):
+    self.client = client
+    self.min_interval = min_interval
+    self.max_interval = max_interval
+    self.backoff = backoff
+    self.show_status = show_status
+    self.statuses = {}
+    self.poll_count = 0
+
+  async def wait(self,
+                 job: Job) -> Job:
+    metrics = get_metrics()
+    interval = self.min_interval
+    last_status = job.status.name
+    status_start = perf_counter()
+    self.update_status(job)
+    while not job.status.name in DONE_STATUSES:
+      await asyncio.sleep(interval)
+      job = await asyncio.to_thread(self.client.get_job, job.id)
+      self.poll_count += 1
+      metrics.count('job_polls')
+      if job.status.name == last_status:
+        interval = min(interval * self.backoff, self.max_interval)
+      else:
+        # Time between polls is charged to the status seen at the earlier one
+        metrics.add_time(f"job_{last_status.lower()}",
+                         perf_counter() - status_start)
+        last_status = job.status.name
+        status_start = perf_counter()
+        interval = self.min_interval
+      self.update_status(job)
+
+    get_job_manager().finish(job)
+    self.statuses.pop(job.id, None)
+    self.update_status()
+    return job
+
+  async def wait_all(self,
+                     jobs: list[Job]) -> list[Job]:
+    return list(await asyncio.gather(*[self.wait(job) for job in jobs]))
+
+  def update_status(self,
+                    job: Job = None):
+    if job is not None:
+      self.statuses[job.id] = job.status.name
+    if not self.show_status:
+      return
+
+    empty_str = ' ' * 64
+    print(empty_str, end="\r")
+    if len(self.statuses) == 1:
+      job_stat = format_str(next(iter(self.statuses.values())), 1)
+      print(f"Job Status: {job_stat}", end="\r")
+    elif len(self.statuses) > 1:
+      job_stats = ', '.join(f"{job_id[:8]} {format_str(job_stat, 1)}"
+                            for job_id, job_stat in self.statuses.items())
+      print(f"Job Status: {job_stats}", end="\r")
+
+
+def wait_for_jobs(jobs: list[Job],
+                  client: Client) -> list[Job]:
+  """
+  Blocks until every job in jobs has completed or failed.
+  """
+  return asyncio.run(JobMonitor(client).wait_all(jobs))
@@ -0,0 +1,200 @@
+import json
+import re
+
+from shared.constants import JSON_READ_SIZE, JSON_MAX_READ_SIZE
+
+
+WHITESPACE = ' \t\n\r'
+WHITESPACE_PATTERN = re.compile(f"[{WHITESPACE}]*")
+
+# A value cut by the end of the buffer fails to decode within this many
+# characters of the cut (e.g. 'fals', '1.5e-', '\u00e'), or decodes as a
+# shorter number ('1.5' of '1.5e-07')
+TRUNCATION_TAIL = 16
+
+
+class JsonReader():
+  """
+  Reads JSON text stream fin one value at a time.
+
+  The stream is read read_size characters at a time, and only the value
+  being decoded and the text not yet consumed are held in memory. Arrays
+  and objects can be walked element by element with iter_array and
+  iter_object, so a large nested array is never decoded whole. A value
+  larger than the buffer makes the next read twice as large, up to
+  max_read_size, so big values are not re-scanned over and over.
+  """
+
+  def __init__(self,
+               fin,
+               read_size: int = JSON_READ_SIZE,
+               max_read_size: int = JSON_MAX_READ_SIZE):
+    self.fin = fin
+    self.read_size = read_size
+    self.max_read_size = max(read_size, max_read_size)
+    self.next_read = read_size
+    self.decoder = json.JSONDecoder()
+    self.buf = ''
+    self.pos = 0
+    self.eof = False
+    # Characters, lines and columns dropped from the front of the buffer,
+    # so errors report their position in the whole stream
+    self.offset = 0
+    self.line_offset = 0
+    self.col_offset = 0
+
+  def fill(self) -> None:
+    done = self.buf[:self.pos]
+    line_count = done.count('\n')
+    if line_count > 0:
+      self.line_offset += line_count
+      self.col_offset = len(done) - done.rfind('\n') - 1
+    else:
+      self.col_offset += len(done)
+    self.offset += len(done)
+
+    chunk = self.fin.read(self.next_read)
+    self.eof = len(chunk) == 0
+    self.buf = self.buf[self.pos:] + chunk
+    self.pos = 0
+
+  def error(self,
+            msg: str,
+            pos: int) -> json.JSONDecodeError:
+    err = json.JSONDecodeError(msg, self.buf, pos)
+    if err.lineno == 1:
+      err.colno += self.col_offset
+    err.lineno += self.line_offset
+    err.pos += self.offset
+    err.args = (f"{msg}: line {err.lineno} column {err.colno} (char {err.pos})",)
+    return err
+
+  def peek(self) -> str:
+    """
+    Skips whitespace and returns the next character, or '' at the end of
+    the stream.
+    """
+    if self.pos < len(self.buf) and not self.buf[self.pos] in WHITESPACE:
+      return self.buf[self.pos]
+    while True:
+      self.pos = WHITESPACE_PATTERN.match(self.buf, self.pos).end()
+      if self.pos < len(self.buf) or self.eof:
+        break
+      self.fill()
+
+    return self.buf[self.pos] if self.pos < len(self.buf) else ''
+
+  def read_value(self) -> object:
+    """
+    Decodes and returns the next value whole.
+    """
+    self.peek()
+    while True:
+      try:
+        obj, end = self.decoder.raw_decode(self.buf, self.pos)
+        # Numbers are the only values a cut can leave valid
+        if self.eof or not type(obj) in (int, float) or len(self.buf) - end > TRUNCATION_TAIL:
+          self.pos = end
+          self.next_read = self.read_size
+          return obj
+      except json.JSONDecodeError as e:
+        truncated = e.msg.startswith('Unterminated string') or e.pos >= len(self.buf) - TRUNCATION_TAIL
+        if self.eof or not truncated:
+          raise self.error(e.msg, e.pos) from None
+
+      if self.pos == 0:
+        self.next_read = min(self.next_read * 2, self.max_read_size)
+      self.fill()
+
+  def iter_array(self):
+    """
+    Steps through the array at the cursor. Each iteration leaves the cursor
+    on the next element, which the caller must consume (with read_value,
+    iter_array or iter_object) before asking for the one after.
+    """
+    if self.peek() != '[':
+      raise self.error('Expecting JSON array', self.pos)
+    self.pos += 1
+    if self.peek() == ']':
+      self.pos += 1
+      return
+
+    while True:
+      char = self.peek()
+      if char == '':
+        raise self.error('Unterminated JSON array', self.pos)
+      if char in ',]':
+        raise self.error('Expecting value', self.pos)
+      yield
+
+      char = self.peek()
+      if char == ']':
+        self.pos += 1
+        return
+      if char == '':
+        raise self.error('Unterminated JSON array', self.pos)
+      if char != ',':
+        raise self.error("Expecting ',' delimiter", self.pos)
+      self.pos += 1
+
+  def iter_values(self):
+    """
+    Yields the elements of the array at the cursor, each decoded whole.
+    """
+    for _ in self.iter_array():
+      yield self.read_value()
+
+  def iter_object(self):
+    """
+    Yields the keys of the object at the cursor. Each iteration leaves the
+    cursor on the key's value, which the caller must consume.
+    """
+    if self.peek() != '{':
+      raise self.error('Expecting JSON object', self.pos)
+    self.pos += 1
+    if self.peek() == '}':
+      self.pos += 1
+      return
+
+    while True:
+      if self.peek() != '"':
+        raise self.error('Expecting property name enclosed in double quotes', self.pos)
+      key = self.read_value()
+      if self.peek() != ':':
+        raise self.error("Expecting ':' delimiter", self.pos)
+      self.pos += 1
+      yield key
+
+      char = self.peek()
+      if char == '}':
+        self.pos += 1
+        return
+      if char == '':
+        raise self.error('Unterminated JSON object', self.pos)
+      if char != ',':
+        raise self.error("Expecting ',' delimiter", self.pos)
+      self.pos += 1
+
+  def finish(self) -> None:
+    """
+    Throws JSONDecodeError if anything but whitespace follows the value read.
+    """
+    if self.peek() != '':
+      raise self.error('Extra data', self.pos)
+
+
+def iter_json_array(fin,
+                    read_size: int = JSON_READ_SIZE):
+  """
+  Yields the elements of the JSON array in text stream fin one at a time,
+  see JsonReader.
+  """
+  reader = JsonReader(fin,
+                      read_size)
+  yield from reader.iter_values()
+  reader.finish()
+
+
+def filter_fields(obj: dict[str, object],
+                  fields: tuple[str, ...]) -> dict[str, object]:
+  return {field: obj[field] for field in fields if field in obj}
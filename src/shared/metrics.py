@@ -0,0 +1,182 @@
+import json
+import threading
+
+from functools import wraps
+from time import perf_counter, time
+
+
+class NullSpan():
+  __slots__ = ()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span():
+  __slots__ = ('metrics', 'name', 'start')
+
+  def __init__(self,
+               metrics: 'Metrics',
+               name: str):
+    self.metrics = metrics
+    self.name = name
+
+  def __enter__(self):
+    self.start = perf_counter()
+    return self
+
+  def __exit__(self, *exc_info):
+    self.metrics.add_time(self.name,
+                          perf_counter() - self.start)
+    return False
+
+
+class Metrics():
+  """
+  Collects time spent per workflow stage (spans) and event counters, both
+  for the whole run and per cycle.
+
+  Disabled by default: span() then returns a shared no-op context manager
+  and add_time/count return immediately, so instrumented code pays one
+  attribute check. end_cycle() appends the cycle's breakdown to a JSON Lines
+  file and to_prometheus() renders the run totals in Prometheus text format.
+  Nested spans are recorded independently, so a stage's time includes any
+  stages it calls.
+  """
+
+  def __init__(self):
+    self.enabled = False
+    self.jsonl_file = None
+    self.lock = threading.Lock()
+    self.spans = {}
+    self.counters = {}
+    self.cycle_spans = {}
+    self.cycle_counters = {}
+    self.cycle_idx = 0
+    self.cycle_label = None
+    self.cycle_start = None
+
+  def enable(self,
+             jsonl_file: str = None) -> None:
+    self.enabled = True
+    self.jsonl_file = jsonl_file
+
+  def span(self,
+           name: str):
+    return Span(self, name) if self.enabled else NULL_SPAN
+
+  def add_time(self,
+               name: str,
+               seconds: float) -> None:
+    if not self.enabled:
+      return
+    with self.lock:
+      for spans in (self.spans, self.cycle_spans):
+        span_stats = spans.setdefault(name, [0, 0.0])
+        span_stats[0] += 1
+        span_stats[1] += seconds
+
+  def count(self,
+            name: str,
+            amount: int = 1) -> None:
+    if not self.enabled:
+      return
+    with self.lock:
+      for counters in (self.counters, self.cycle_counters):
+        counters[name] = counters.get(name, 0) + amount
+
+  def start_cycle(self,
+                  label: str = None) -> None:
+    if not self.enabled:
+      return
+    with self.lock:
+      self.cycle_spans = {}
+      self.cycle_counters = {}
+      self.cycle_label = label
+      self.cycle_start = perf_counter()
+
+  def end_cycle(self) -> dict[str, object]:
+    """
+    Closes the current cycle, appends its record to the JSON Lines file and
+    returns it. Returns None when disabled.
+    """
+    if not self.enabled or self.cycle_start is None:
+      return None
+
+    with self.lock:
+      self.cycle_idx += 1
+      record = {'cycle': self.cycle_idx,
+                'label': self.cycle_label,
+                'timestamp': time(),
+                'seconds': perf_counter() - self.cycle_start,
+                'spans': {name: {'count': span_stats[0],
+                                 'seconds': span_stats[1]}
+                          for name, span_stats in self.cycle_spans.items()},
+                'counters': dict(self.cycle_counters)}
+      self.cycle_start = None
+      self.counters['cycles'] = self.counters.get('cycles', 0) + 1
+
+    if self.jsonl_file is not None:
+      with open(self.jsonl_file, 'a') as fout:
+        fout.write(json.dumps(record) + '\n')
+    return record
+
+  def to_prometheus(self) -> str:
+    lines = ['# HELP genai_stage_seconds_total Time spent in each workflow stage.',
+             '# TYPE genai_stage_seconds_total counter']
+    with self.lock:
+      spans = sorted(self.spans.items())
+      counters = sorted(self.counters.items())
+    for name, span_stats in spans:
+      lines.append(f"genai_stage_seconds_total{{stage=\"{name}\"}} {span_stats[1]:.6f}")
+    lines += ['# HELP genai_stage_calls_total Number of times each workflow stage ran.',
+              '# TYPE genai_stage_calls_total counter']
+    for name, span_stats in spans:
+      lines.append(f"genai_stage_calls_total{{stage=\"{name}\"}} {span_stats[0]}")
+    lines += ['# HELP genai_events_total Workflow event counters.',
+              '# TYPE genai_events_total counter']
+    for name, amount in counters:
+      lines.append(f"genai_events_total{{event=\"{name}\"}} {amount}")
+    return '\n'.join(lines) + '\n'
+
+  def write_prometheus(self,
+                       prom_file: str) -> None:
+    with open(prom_file, 'w') as fout:
+      fout.write(self.to_prometheus())
+
+
+def format_cycle(record: dict[str, object]) -> str:
+  lines = [f"Cycle {record['cycle']} took {record['seconds']:.2f} s"]
+  for name, span_stats in sorted(record['spans'].items(),
+                                 key=lambda item: -item[1]['seconds']):
+    lines.append(f"  {name:<24}{span_stats['seconds']:9.3f} s  x{span_stats['count']}")
+  for name, amount in sorted(record['counters'].items()):
+    lines.append(f"  {name:<24}{amount:>9}")
+  return '\n'.join(lines)
+
+
+metrics = Metrics()
+
+def get_metrics() -> Metrics:
+  return metrics
+
+
+def timed(name: str):
+  """
+  Decorator recording every call of the function as a span named name.
+  """
+  def decorator(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+      if not metrics.enabled:
+        return func(*args, **kwargs)
+      with Span(metrics, name):
+        return func(*args, **kwargs)
+    return wrapper
+  return decorator
@@ -0,0 +1,233 @@
+import asyncio
+import random
+
+from datetime import datetime, timezone
+from time import monotonic
+
+from istari_digital_client import Client
+from shared.constants import WATCH_MIN_INTERVAL, WATCH_MAX_INTERVAL, WATCH_BACKOFF, WATCH_JITTER, WATCH_SETTLE_TIME, WATCH_MAX_SETTLE_TIME
+
+
+class RevisionWatcher():
+  """
+  Watches any number of models for new file revisions from one event loop.
+
+  Each model is polled on its own schedule: the interval starts at
+  min_interval and grows by backoff (up to max_interval) for every poll that
+  sees no new revision, and every interval is randomized by +/- jitter so
+  several watchers do not poll in lockstep. After the first model file
+  is fetched with get_model, later polls only fetch the file (get_file),
+  which skips the model's artifact and job lists.
+
+  Once a change is seen, every watched model is polled at min_interval until
+  settle_time passes without another new revision, so a burst of revisions
+  (or both models changing together) wakes the caller once. A burst that
+  keeps going wakes the caller max_settle_time after its first revision.
+
+  The client only needs get_model(model_id) and, optionally, get_file(file_id),
+  so a fake registry can stand in for the real one.
+  """
+
+  def __init__(self,
+               client: Client,
+               min_interval: float = WATCH_MIN_INTERVAL,
+               max_interval: float = WATCH_MAX_INTERVAL,
+               backoff: float = WATCH_BACKOFF,
+               jitter: float = WATCH_JITTER,
+               settle_time: float = WATCH_SETTLE_TIME,
+               max_settle_time: float = WATCH_MAX_SETTLE_TIME,
+               show_status: bool = True):
+    self.client = client
+    self.min_interval = min_interval
+    self.max_interval = max_interval
+    self.backoff = backoff
+    self.jitter = jitter
+    self.settle_time = settle_time
+    self.max_settle_time = max(max_settle_time, settle_time)
+    self.show_status = show_status
+    self.file_ids = {}
+    self.mod_names = {}
+    self.latest_revs = {}
+    self.seen_rev_ids = {}
+    self.intervals = {}
+    self.request_count = 0
+    self.wakeup_count = 0
+    self.revision_count = 0
+    self.coalesced_count = 0
+    self.detect_delays = []
+
+  def get_revisions(self,
+                    mod_id: str) -> list:
+    self.request_count += 1
+    file_id = self.file_ids.get(mod_id)
+    if file_id is None or not hasattr(self.client, 'get_file'):
+      mod_file = self.client.get_model(mod_id).file
+      self.file_ids[mod_id] = mod_file.id
+    else:
+      mod_file = self.client.get_file(file_id)
+
+    revs = mod_file.revisions
+    if not mod_id in self.mod_names:
+      self.mod_names[mod_id] = revs[0].display_name or mod_id
+    return revs
+
+  def check(self,
+            mod_id: str) -> int:
+    """
+    Polls one model, records its latest revision and returns how many
+    revisions appeared since the last check. A latest revision already
+    marked as seen does not count.
+    """
+    revs = self.get_revisions(mod_id)
+    latest_rev = max(revs, key=lambda rev: rev.created)
+    prev_rev = self.latest_revs.get(mod_id)
+    self.latest_revs[mod_id] = latest_rev
+    if prev_rev is None or latest_rev.id in (prev_rev.id, self.seen_rev_ids.get(mod_id)):
+      return 0
+
+    now = datetime.now(timezone.utc)
+    new_revs = [rev for rev in revs if rev.created > prev_rev.created]
+    for rev in new_revs:
+      created = rev.created if rev.created.tzinfo else rev.created.replace(tzinfo=timezone.utc)
+      self.detect_delays.append((now - created).total_seconds())
+    return max(len(new_revs), 1)
+
+  def watch(self,
+            mod_ids: list[str]) -> dict[str, str]:
+    """
+    Starts watching mod_ids. Their current latest revisions are the baseline
+    a later wait() compares against. Returns {model id: revision id}.
+    """
+    for mod_id in mod_ids:
+      if not mod_id in self.latest_revs:
+        self.check(mod_id)
+        self.mark_seen(mod_id, self.latest_revs[mod_id].id)
+
+    return {mod_id: self.latest_revs[mod_id].id for mod_id in mod_ids}
+
+  def mark_seen(self,
+                mod_id: str,
+                rev_id: str) -> None:
+    """
+    Sets the revision of mod_id the next wait() treats as already handled,
+    e.g. a revision the caller created itself.
+    """
+    self.seen_rev_ids[mod_id] = rev_id
+
+  def get_superseded(self,
+                     rev_ids: dict[str, str]) -> dict[str, object]:
+    """
+    Polls every model in {model id: revision id} now and returns
+    {model id: latest revision} for those whose latest revision is no longer
+    the given one.
+    """
+    superseded = {}
+    for mod_id, rev_id in rev_ids.items():
+      self.revision_count += self.check(mod_id)
+      latest_rev = self.latest_revs[mod_id]
+      if latest_rev.id != rev_id:
+        superseded[mod_id] = latest_rev
+
+    return superseded
+
+  def get_changed(self) -> dict[str, object]:
+    return {mod_id: latest_rev
+            for mod_id, latest_rev in self.latest_revs.items()
+            if latest_rev.id != self.seen_rev_ids.get(mod_id)}
+
+  def get_delay(self,
+                interval: float) -> float:
+    return interval * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+  async def wait_async(self,
+                       timeout: float = None,
+                       settle: bool = False) -> dict[str, object]:
+    next_polls = {mod_id: monotonic() for mod_id in self.latest_revs}
+    settle_deadline = None
+    burst_deadline = None
+    if settle:
+      burst_deadline = monotonic() + self.max_settle_time
+      settle_deadline = monotonic() + self.settle_time
+    timeout_deadline = None if timeout is None else monotonic() + timeout
+    revision_count = self.revision_count
+    while True:
+      if settle_deadline is not None and monotonic() >= settle_deadline:
+        break
+      if settle_deadline is None and timeout_deadline is not None and monotonic() >= timeout_deadline:
+        break
+
+      self.update_status(settle_deadline is not None)
+      wake_time = min(next_polls.values())
+      if settle_deadline is not None:
+        wake_time = min(wake_time, settle_deadline)
+      elif timeout_deadline is not None:
+        wake_time = min(wake_time, timeout_deadline)
+      await asyncio.sleep(max(wake_time - monotonic(), 0.0))
+
+      due_ids = [mod_id for mod_id, next_poll in next_polls.items() if next_poll <= monotonic()]
+      new_counts = await asyncio.gather(*[asyncio.to_thread(self.check, mod_id) for mod_id in due_ids])
+      for mod_id, new_count in zip(due_ids, new_counts):
+        interval = self.intervals.get(mod_id, self.min_interval)
+        if new_count > 0:
+          self.revision_count += new_count
+          interval = self.min_interval
+          if burst_deadline is None:
+            burst_deadline = monotonic() + self.max_settle_time
+          settle_deadline = min(monotonic() + self.settle_time, burst_deadline)
+        elif settle_deadline is None:
+          interval = min(interval * self.backoff, self.max_interval)
+        else:
+          interval = self.min_interval
+        self.intervals[mod_id] = interval
+        next_polls[mod_id] = monotonic() + self.get_delay(interval)
+
+    changed = self.get_changed()
+    if len(changed) == 0:
+      return changed
+
+    self.wakeup_count += 1
+    self.coalesced_count += max(self.revision_count - revision_count - 1, 0)
+    for mod_id, latest_rev in changed.items():
+      self.mark_seen(mod_id, latest_rev.id)
+      self.intervals[mod_id] = self.min_interval
+
+    self.update_status(False, changed)
+    return changed
+
+  def wait(self,
+           timeout: float = None,
+           settle: bool = False) -> dict[str, object]:
+    """
+    Blocks until at least one watched model has a revision newer than its
+    baseline and the burst has settled. Returns {model id: latest revision}
+    for every model that changed, or {} if timeout seconds pass first.
+
+    With settle, a change is already known (e.g. from get_superseded()) and
+    the wait only lasts until the models stop changing.
+    """
+    return asyncio.run(self.wait_async(timeout, settle))
+
+  def update_status(self,
+                    settling: bool,
+                    changed: dict[str, object] = None) -> None:
+    if not self.show_status:
+      return
+
+    empty_str = ' ' * 64
+    print(empty_str, end="\r")
+    if changed is not None:
+      for mod_id in changed:
+        print(f"Model update detected: {self.mod_names[mod_id]}")
+    else:
+      state = 'Waiting for updates to settle' if settling else 'Polling for model updates'
+      mod_names = ', '.join(self.mod_names[mod_id] for mod_id in self.latest_revs)
+      print(f"{state}: {mod_names}", end="\r")
+
+  def get_stats(self) -> dict[str, object]:
+    detect_count = len(self.detect_delays)
+    return {'requests': self.request_count,
+            'wakeups': self.wakeup_count,
+            'revisions': self.revision_count,
+            'coalesced': self.coalesced_count,
+            'mean_detect_s': sum(self.detect_delays) / detect_count if detect_count else None,
+            'max_detect_s': max(self.detect_delays) if detect_count else None}
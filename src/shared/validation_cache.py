@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+
+from shared.constants import VALIDATION_CACHE_FILE, VALIDATION_CACHE_SIZE
+
+
+# Bump when matching or bounds logic changes so old verdicts are discarded
+VALIDATION_CACHE_VERSION = 2
+
+
+class ValidationCache():
+  """
+  On-disk cache of validation results keyed by the (Cameo revision id, CAD
+  revision id) pair they were computed from.
+
+  Each entry holds the number of failing pairs and the matched pairs of the
+  failing parameters only, which is all the solver needs, so a passing
+  result costs a few bytes. Only the most recent VALIDATION_CACHE_SIZE
+  entries are kept.
+  """
+
+  def __init__(self,
+               cache_file: str = VALIDATION_CACHE_FILE,
+               max_entries: int = VALIDATION_CACHE_SIZE):
+    self.cache_file = cache_file
+    self.max_entries = max_entries
+    self.lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.results = {}
+    if os.path.exists(cache_file):
+      try:
+        with open(cache_file, 'r') as fin:
+          cache_obj = json.load(fin)
+        if cache_obj.get('version') == VALIDATION_CACHE_VERSION:
+          self.results = cache_obj['results']
+      except (OSError, ValueError, KeyError):
+        self.results = {}
+
+  @staticmethod
+  def result_key(cam_rev_id: str,
+                 cad_rev_id: str) -> str:
+    return f"{cam_rev_id}/{cad_rev_id}"
+
+  def get(self,
+          cam_rev_id: str,
+          cad_rev_id: str) -> dict[str, object]:
+    """
+    Returns {'param_reqs': [(param, req), ...], 'fail_count': n} for the
+    revision pair, where param_reqs are the pairs of the failing parameters,
+    or None if it has not been validated.
+    """
+    with self.lock:
+      result = self.results.get(self.result_key(cam_rev_id, cad_rev_id))
+      if result is None:
+        self.misses += 1
+        return None
+      self.hits += 1
+
+    return {'param_reqs': [tuple(param_req) for param_req in result['param_reqs']],
+            'fail_count': result['fail_count']}
+
+  def put(self,
+          cam_rev_id: str,
+          cad_rev_id: str,
+          param_reqs: list[tuple[dict[str, object], dict[str, object]]],
+          fail_param_reqs: list[tuple[dict[str, object], dict[str, object]]]) -> None:
+    fail_names = set(param_obj['name'] for param_obj, _ in fail_param_reqs)
+    with self.lock:
+      key = self.result_key(cam_rev_id, cad_rev_id)
+      self.results.pop(key, None)
+      self.results[key] = {'param_reqs': [list(param_req) for param_req in param_reqs if param_req[0]['name'] in fail_names],
+                           'fail_count': len(fail_param_reqs)}
+      while len(self.results) > self.max_entries:
+        del self.results[next(iter(self.results))]
+      self.save()
+
+  def save(self) -> None:
+    cache_dir = os.path.dirname(self.cache_file)
+    if cache_dir:
+      os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = f"{self.cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_file, 'w') as fout:
+      json.dump({'version': VALIDATION_CACHE_VERSION,
+                 'results': self.results},
+                fout)
+    os.replace(tmp_file, self.cache_file)
+
+  def get_stats(self) -> dict[str, int]:
+    return {'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.results)}
+
+
+validation_cache = None
+
+def get_validation_cache() -> ValidationCache:
+  global validation_cache
+  if validation_cache is None:
+    validation_cache = ValidationCache()
+  return validation_cache
@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+from components.validate_requirements import get_checks, get_failing_params, fix_failing_params
+
+
+# Values that parse, that fail to parse and that sit exactly on a bound
+VALUES = ['12.5mm', '-3', '1e2 in', '0', 'abc', '', '1.2.3mm', '--', '10', '20mm', '5.0']
+BOUNDS = ['[10;20]', '[ 0 ; 5 ]', '<10', '<=10', '>20', '>=20', '=5', '= 12.5', '<= -3']
+
+
+def make_pairs(rnd: random.Random,
+               pair_count: int) -> list[tuple[dict[str, object], dict[str, object]]]:
+  return [({'name': f"Part\\Param{pair_idx}",
+            'value': rnd.choice(VALUES),
+            'units': 'mm'},
+           {'qualified_name': f"System::Req{pair_idx}::Param{pair_idx}",
+            'bounds': rnd.choice(BOUNDS)})
+          for pair_idx in range(pair_count)]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_batch_matches_scalar(seed):
+  param_reqs = make_pairs(random.Random(seed), 200)
+  assert get_checks(param_reqs, batch=True) == get_checks(param_reqs, batch=False)
+  assert get_failing_params(param_reqs, batch=True) == get_failing_params(param_reqs, batch=False)
+  assert fix_failing_params(param_reqs, batch=True) == fix_failing_params(param_reqs, batch=False)
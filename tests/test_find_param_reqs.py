@@ -0,0 +1,106 @@
+import json
+import random
+
+import pytest
+
+from components.validate_requirements import find_param_reqs
+
+
+# Characters names are drawn from: path and namespace separators, spaces for
+# the stripping rules and a non-ASCII letter for the Windows-1252 export
+NAME_CHARS = 'ab:_\\ é'
+
+
+def find_param_reqs_brute_force(req_file: str,
+                                param_file: str) -> list[tuple[dict[str, object], dict[str, object]]]:
+  """
+  Reference matcher: every parameter against every requirement.
+  """
+  prs = []
+
+  with open(req_file, 'r', encoding='Windows-1252') as fin:
+    reqs_obj = json.load(fin)
+
+  with open(param_file, 'r', encoding='utf-8') as fin:
+    params_obj = json.load(fin)
+
+  for param_obj in params_obj:
+    params = param_obj['parameters']
+    if not params is None:
+      for param in params:
+        param_name = param['name'].split('\\')[-1].strip()
+        for req_obj in reqs_obj:
+          req_name = req_obj['qualified_name'].strip()
+          if req_name.endswith(param_name):
+            prs.append((param, req_obj))
+
+  return prs
+
+
+def get_pair_keys(param_reqs) -> list[tuple[str, str, str, str]]:
+  return [(param['name'], param['value'], req_obj['qualified_name'], req_obj['bounds'])
+          for param, req_obj in param_reqs]
+
+
+def make_name(rnd: random.Random) -> str:
+  return ''.join(rnd.choice(NAME_CHARS) for _ in range(rnd.randint(0, 6)))
+
+
+def make_files(rnd: random.Random,
+               tmp_path,
+               case_idx: int) -> tuple[str, str]:
+  names = [make_name(rnd) for _ in range(rnd.randint(1, 8))]
+  reqs_obj = []
+  for req_idx in range(rnd.randint(0, 30)):
+    # Reusing names gives duplicate qualified names
+    qual_name = rnd.choice(names) if rnd.random() < 0.3 else make_name(rnd)
+    reqs_obj.append({'qualified_name': ' ' * rnd.randint(0, 1) + qual_name + ' ' * rnd.randint(0, 1),
+                     'bounds': f"<{req_idx}"})
+  params_obj = []
+  for part_idx in range(rnd.randint(0, 4)):
+    params = None
+    if rnd.random() < 0.9:
+      params = [{'name': f"Part{part_idx}\\{rnd.choice(names) if rnd.random() < 0.5 else make_name(rnd)}",
+                 'value': f"{param_idx}mm",
+                 'units': 'mm'}
+                for param_idx in range(rnd.randint(0, 8))]
+    params_obj.append({'parameters': params})
+
+  req_file = tmp_path / f"requirements{case_idx}.json"
+  param_file = tmp_path / f"parameters{case_idx}.json"
+  with open(req_file, 'w', encoding='Windows-1252') as fout:
+    json.dump(reqs_obj, fout, ensure_ascii=False)
+  with open(param_file, 'w', encoding='utf-8') as fout:
+    json.dump(params_obj, fout)
+  return str(req_file), str(param_file)
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_matches_brute_force(tmp_path, compact):
+  rnd = random.Random(0)
+  for case_idx in range(300):
+    req_file, param_file = make_files(rnd, tmp_path, case_idx)
+    expected = get_pair_keys(find_param_reqs_brute_force(req_file, param_file))
+    assert get_pair_keys(find_param_reqs(req_file, param_file, compact)) == expected
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_edge_cases(tmp_path, compact):
+  reqs_obj = [{'qualified_name': 'Sys::Width ', 'bounds': '<1'},
+              {'qualified_name': ' Sys::Width', 'bounds': '<2'},
+              {'qualified_name': 'Sys::Height', 'bounds': '<3'},
+              {'qualified_name': '', 'bounds': '<4'}]
+  params_obj = [{'parameters': [{'name': 'Part\\ Width ', 'value': '1mm', 'units': 'mm'},
+                                {'name': 'Part\\', 'value': '2mm', 'units': 'mm'}]},
+                {'parameters': None}]
+  req_file = tmp_path / 'requirements.json'
+  param_file = tmp_path / 'parameters.json'
+  req_file.write_text(json.dumps(reqs_obj), encoding='Windows-1252')
+  param_file.write_text(json.dumps(params_obj), encoding='utf-8')
+
+  pairs = get_pair_keys(find_param_reqs(str(req_file), str(param_file), compact))
+  assert pairs == get_pair_keys(find_param_reqs_brute_force(str(req_file), str(param_file)))
+  # Both duplicate names match the stripped parameter name, and an empty
+  # parameter name matches every requirement
+  assert [req_bnds for name, _, _, req_bnds in pairs if name == 'Part\\ Width '] == ['<1', '<2']
+  assert len([name for name, _, _, _ in pairs if name == 'Part\\']) == len(reqs_obj)
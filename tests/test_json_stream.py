@@ -0,0 +1,107 @@
+import io
+import json
+import random
+
+import pytest
+
+from components.validate_requirements import load_parameters, PARAM_FIELDS
+from shared.json_stream import JsonReader, iter_json_array
+
+
+VALID_ARRAYS = ['[]',
+                ' [ ] \n',
+                '[1]',
+                '[ 1 , 2 ]  ',
+                '[1, 2.5e-07 , "a,]", {"k": [1, 2]}, null, true]\n']
+
+INVALID_ARRAYS = ['',
+                  '{}',
+                  '[',
+                  '[1,',
+                  '[1,,2]',
+                  '[,1]',
+                  '[1,]',
+                  '[1 2]',
+                  '[1]x',
+                  '[] []']
+
+
+@pytest.mark.parametrize('read_size', [1, 2, 3, 64])
+@pytest.mark.parametrize('text', VALID_ARRAYS)
+def test_matches_json_loads(text, read_size):
+  assert list(iter_json_array(io.StringIO(text), read_size)) == json.loads(text)
+
+
+@pytest.mark.parametrize('read_size', [1, 2, 64])
+@pytest.mark.parametrize('text', INVALID_ARRAYS)
+def test_rejects_malformed_arrays(text, read_size):
+  with pytest.raises(json.JSONDecodeError):
+    list(iter_json_array(io.StringIO(text), read_size))
+
+
+def make_export(rnd: random.Random) -> list[dict[str, object]]:
+  return [{'part': f"Part{part_idx}",
+           'properties': {'mass': rnd.uniform(0, 1e3), 'tags': ['a', None, True]},
+           'parameters': None if rnd.random() < 0.1 else
+                         [{'name': f"Part{part_idx}\\Param{param_idx}",
+                           'value': f"{rnd.uniform(-1e3, 1e3):.6g}mm",
+                           'units': 'mm',
+                           'comment': 'x' * rnd.randrange(40)}
+                          for param_idx in range(rnd.randrange(6))]}
+          for part_idx in range(rnd.randrange(8))]
+
+
+def read_nested(reader: JsonReader) -> list[dict[str, object]]:
+  parts = []
+  for _ in reader.iter_array():
+    part = {}
+    for key in reader.iter_object():
+      if key == 'parameters' and reader.peek() == '[':
+        part[key] = list(reader.iter_values())
+      else:
+        part[key] = reader.read_value()
+    parts.append(part)
+  reader.finish()
+  return parts
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_walks_nested_values(indent):
+  rnd = random.Random(0)
+  for _ in range(100):
+    export = make_export(rnd)
+    text = json.dumps(export, indent=indent)
+    read_size = rnd.randrange(1, 40)
+    assert read_nested(JsonReader(io.StringIO(text), read_size)) == export
+
+
+def test_load_parameters_keeps_used_fields():
+  export = make_export(random.Random(1)) + [{'parameters': []}, {}]
+  params_obj = load_parameters(io.StringIO(json.dumps(export, indent=1)))
+  assert params_obj == [{'parameters': None if part_obj.get('parameters') is None else
+                                       [{field: param[field] for field in PARAM_FIELDS if field in param}
+                                        for param in part_obj['parameters']]}
+                        for part_obj in export]
+
+
+class CountingReader(io.StringIO):
+  def __init__(self, text: str):
+    super().__init__(text)
+    self.read_count = 0
+
+  def read(self, size: int = -1) -> str:
+    self.read_count += 1
+    return super().read(size)
+
+
+def test_stops_at_first_malformed_element():
+  text = '[' + ', '.join(['{"a": 1}'] * 10 + ['{"a": tru}'] + ['{"a": 1}'] * 100000) + ']'
+  with pytest.raises(json.JSONDecodeError) as expected:
+    json.loads(text)
+  fin = CountingReader(text)
+  with pytest.raises(json.JSONDecodeError) as actual:
+    list(iter_json_array(fin, 64))
+  assert actual.value.msg == expected.value.msg
+  assert actual.value.pos == expected.value.pos
+  assert str(actual.value) == str(expected.value)
+  assert fin.read_count < 10
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from benchmarks.synthetic import make_requirements, make_parameters, write_requirements, write_parameters
+from components.validate_requirements import find_param_reqs, get_failing_params, fix_failing_params
+
+
+def as_dicts(param_reqs) -> list[tuple[dict[str, object], dict[str, object]]]:
+  return [(dict(param_obj), dict(req_obj)) for param_obj, req_obj in param_reqs]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+  # Every other requirement appears twice, so parameters match one or two
+  reqs_obj = make_requirements(300)
+  reqs_obj += reqs_obj[::2]
+  req_file = tmp_path / 'requirements.json'
+  param_file = tmp_path / 'parameters.json'
+  write_requirements(req_file, reqs_obj)
+  write_parameters(param_file, make_parameters(400, 300, part_size=30))
+  return str(req_file), str(param_file)
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_compact_matches_list(snapshot, batch):
+  param_reqs = find_param_reqs(*snapshot)
+  compact_reqs = find_param_reqs(*snapshot, compact=True)
+  assert as_dicts(compact_reqs) == as_dicts(param_reqs)
+  assert as_dicts(get_failing_params(compact_reqs, batch)) == as_dicts(get_failing_params(param_reqs, batch))
+  assert fix_failing_params(compact_reqs, batch) == fix_failing_params(param_reqs, batch)
+
+
+def test_source_idxs_locate_entries(snapshot):
+  req_file, param_file = snapshot
+  with open(req_file, 'r', encoding='Windows-1252') as fin:
+    reqs_obj = json.load(fin)
+  with open(param_file, 'r') as fin:
+    params = [param for param_obj in json.load(fin) for param in param_obj['parameters']]
+
+  compact_reqs = find_param_reqs(req_file, param_file, compact=True)
+  for pair_idx, (param_obj, req_obj) in enumerate(compact_reqs):
+    param_src, req_src = compact_reqs.get_source_idxs(pair_idx)
+    assert params[param_src]['name'] == param_obj['name']
+    assert reqs_obj[req_src]['qualified_name'] == req_obj['qualified_name']
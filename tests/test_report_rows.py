@@ -0,0 +1,26 @@
+from components.validate_requirements import iter_report_rows
+
+
+PARAM_REQS = [({'name': 'P0', 'value': '15mm'}, {'qualified_name': 'R0', 'bounds': '[10;20]'}),
+              ({'name': 'P1', 'value': '25mm'}, {'qualified_name': 'R1', 'bounds': '<=20'}),
+              ({'name': 'P2', 'value': '50mm'}, {'qualified_name': 'R2', 'bounds': '[10;20]'}),
+              ({'name': 'P3', 'value': '5mm'}, {'qualified_name': 'R3', 'bounds': '>=20'}),
+              ({'name': 'P4', 'value': '1mm'}, {'qualified_name': 'R4', 'bounds': '=2'})]
+CHECKS = [True, False, False, False, False]
+
+
+def get_names(rows) -> list[str]:
+  return [param_name for _, param_name, _, _, _ in rows]
+
+
+def test_pages_in_input_order():
+  assert get_names(iter_report_rows(PARAM_REQS, CHECKS, False, None)) == ['P0', 'P1', 'P2', 'P3', 'P4']
+  assert get_names(iter_report_rows(PARAM_REQS, CHECKS, True, 2)) == ['P1', 'P2']
+  assert get_names(iter_report_rows(PARAM_REQS, CHECKS, True, 2, 2)) == ['P3', 'P4']
+  assert get_names(iter_report_rows(PARAM_REQS, CHECKS, True, 2, 4)) == []
+
+
+def test_ranks_failures_by_distance():
+  # 30 off, 15 off, 5 off, then 1 off
+  assert get_names(iter_report_rows(PARAM_REQS, CHECKS, True, None, rank=True)) == ['P2', 'P3', 'P1', 'P4']
+  assert get_names(iter_report_rows(PARAM_REQS, CHECKS, False, 2, 3, rank=True)) == ['P4', 'P0']